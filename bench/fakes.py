@@ -0,0 +1,80 @@
+"""벤치마크용 Discord/yt-dlp 대역 객체. 네트워크 없이 cog의 코드 경로만 실행되도록 필요한 속성만 흉내 냅니다."""
+import copy
+import json
+import os
+
+from cogs.extractor import _slim
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return json.load(f)
+
+
+class FakeMessage:
+    """진행바 메시지. edit은 실제 요청 없이 임베드만 교체합니다."""
+    def __init__(self, embed):
+        self.embeds = [embed]
+        self.edits = 0
+
+    async def edit(self, embed=None, **kwargs):
+        self.edits += 1
+        self.embeds = [embed]
+
+    async def delete(self):
+        pass
+
+
+class FakeVoiceClient:
+    def __init__(self, playing=True):
+        self.playing = playing
+
+    def is_playing(self):
+        return self.playing
+
+    def is_paused(self):
+        return not self.playing
+
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+        self.voice_client = FakeVoiceClient()
+
+
+class FakeBot:
+    shard_count = None
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.guilds = {}
+
+    def add_guild(self, guild_id):
+        guild = self.guilds[guild_id] = FakeGuild(guild_id)
+        return guild
+
+    def get_guild(self, guild_id):
+        return self.guilds.get(guild_id)
+
+    @property
+    def voice_clients(self):
+        return [guild.voice_client for guild in self.guilds.values()]
+
+
+class FakeExtractor:
+    """yt-dlp 워커 풀 대역. 녹화된 추출 결과를 워커와 같은 방식으로 가볍게 만들어 돌려줍니다."""
+    size = 0
+
+    def __init__(self, results):
+        self.results = results # profile: 추출 결과 dict
+
+    async def extract(self, profile, url, timeout=None, reject=True):
+        return _slim(copy.deepcopy(self.results[profile]))
+
+    def stats(self):
+        return {'workers': 0, 'in_flight': 0, 'queued': 0, 'rejected': 0, 'restarts': 0}
+
+    def shutdown(self):
+        pass
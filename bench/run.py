@@ -0,0 +1,361 @@
+"""miniY 핫 패스 오프라인 마이크로벤치마크.
+
+네트워크/Discord/yt-dlp 없이 bench/fixtures의 녹화된 데이터와 bench/fakes의 대역 객체로 cog 코드를 실행합니다.
+
+    python -m bench.run                        # 전체 실행 (결과 표는 stderr)
+    python -m bench.run --json result.json     # 결과를 JSON으로 저장 ('-'면 stdout)
+    python -m bench.run --compare base.json    # 이전 결과와 비교, 기준보다 느려진 항목이 있으면 종료 코드 1
+    python -m bench.run -k queue               # 이름에 queue가 들어간 항목만 실행
+"""
+import os
+import sys
+import gc
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from types import SimpleNamespace
+
+# 캐시 파일이 실제 cache/ 폴더를 건드리지 않도록 cogs 임포트 전에 임시 폴더 지정 (실행이 끝나면 삭제)
+TEMP_CACHE = None
+if 'MUSIC_CACHE_DIR' not in os.environ:
+    TEMP_CACHE = tempfile.TemporaryDirectory(prefix='miniy-bench-')
+    os.environ['MUSIC_CACHE_DIR'] = TEMP_CACHE.name
+
+import discord
+
+from cogs.music import Music
+from cogs.player import GuildPlayer, Track
+from cogs.subtitles import SubtitleTrack, cues_from_snippets
+from cogs.subtitle_parser import parse_captions
+from bench.fakes import FakeBot, FakeExtractor, FakeMessage, FIXTURES, load_fixture
+
+BENCHMARKS = []
+
+
+def benchmark(func):
+    BENCHMARKS.append(func)
+    return func
+
+
+def result_key(record):
+    params = ','.join(f"{k}={v}" for k, v in sorted(record['params'].items()))
+    return f"{record['name']}[{params}]" if params else record['name']
+
+
+def format_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:.3f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.2f}us"
+
+
+class Runner:
+    def __init__(self, repeat, pattern=None):
+        self.repeat = repeat
+        self.pattern = pattern
+        self.results = []
+
+    async def measure(self, name, func, number=1, params=None, setup=None, ops=None):
+        """func(동기/비동기)를 number번 실행하는 측정을 repeat번 반복합니다.
+
+        setup은 각 반복 전에 측정 밖에서 실행되며, 결과 시간은 func 1회 실행 기준입니다.
+        ops를 주면 1회 실행이 처리하는 항목 수로 보고 초당 처리량도 기록합니다.
+        """
+        if self.pattern and self.pattern not in name:
+            return
+        samples = []
+        gc.collect()
+        for _ in range(self.repeat):
+            if setup:
+                prepared = setup()
+                if asyncio.iscoroutine(prepared):
+                    await prepared
+            started = time.perf_counter()
+            for _ in range(number):
+                result = func()
+                if asyncio.iscoroutine(result):
+                    await result
+            samples.append((time.perf_counter() - started) / number)
+
+        record = {
+            'name': name,
+            'params': params or {},
+            'repeat': self.repeat,
+            'number': number,
+            'median_s': statistics.median(samples),
+            'mean_s': statistics.fmean(samples),
+            'min_s': min(samples),
+            'stdev_s': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        }
+        if ops:
+            record['ops'] = ops
+            record['ops_per_s'] = ops / record['median_s'] if record['median_s'] else None
+        self.results.append(record)
+        throughput = f"  {record['ops_per_s']:,.0f} ops/s" if ops else ""
+        print(f"{result_key(record):<52} {format_seconds(record['median_s']):>11}"
+              f"  (min {format_seconds(record['min_s'])}){throughput}", file=sys.stderr)
+
+
+def make_tracks(count):
+    return [
+        Track(id=f"vid{i:08d}", title=f"Track {i} - Artist {i % 97}", duration=180 + i % 120,
+              webpage_url=f"https://www.youtube.com/watch?v=vid{i:08d}")
+        for i in range(count)
+    ]
+
+
+def make_subtitles(count):
+    snippets = load_fixture('transcript.json')
+    span = snippets[-1]['start'] + snippets[-1]['duration']
+    expanded = []
+    for i in range(count):
+        s = snippets[i % len(snippets)]
+        offset = (i // len(snippets)) * span
+        expanded.append(SimpleNamespace(text=s['text'], start=s['start'] + offset, duration=s['duration']))
+    return expanded
+
+
+def progress_embed():
+    embed = discord.Embed(color=discord.Color.blue())
+    embed.add_field(name="재생 진행도", value="`🔘▬▬▬▬▬▬▬▬▬▬▬▬▬▬`\n⏳ 00:00 / 00:00", inline=False)
+    return embed
+
+
+@benchmark
+async def bench_update_controller(runner, cog, bot):
+    subtitles = SubtitleTrack.from_cues(cues_from_snippets(make_subtitles(300)))
+    rng = random.Random(1)
+    for guilds in (1, 100, 1000):
+        cog.players.clear()
+        bot.guilds.clear()
+        players = []
+        for guild_id in range(1, guilds + 1):
+            bot.add_guild(guild_id)
+            player = GuildPlayer(guild_id)
+            player.current = Track(id=f"vid{guild_id}", title=f"Track {guild_id}", duration=240)
+            player.is_playing = True
+            # 곡 끝부분(사전 준비 구간)에 걸리지 않는 재생 위치
+            player.start_time = time.time() - rng.uniform(0, 200)
+            player.subtitles = subtitles
+            player.progress_msg = FakeMessage(progress_embed())
+            cog.players[guild_id] = player
+            players.append(player)
+
+        async def reset():
+            # 직전 반복에서 만든 편집 작업을 끝내고, 모든 서버가 다시 편집 대상이 되도록 초기화
+            await asyncio.gather(*(p.edit_task for p in players if p.edit_task))
+            now = time.time()
+            for p in players:
+                p.last_rendered = None
+                p.saved_at = now
+
+        await runner.measure('update_controller_tick', cog.update_controller, params={'guilds': guilds},
+                             setup=reset, ops=guilds)
+        await reset()
+    cog.players.clear()
+    bot.guilds.clear()
+
+
+@benchmark
+async def bench_subtitle_lookup(runner, cog, bot):
+    subtitles = SubtitleTrack.from_cues(cues_from_snippets(make_subtitles(5000)))
+    end = subtitles.ends[-1]
+    rng = random.Random(2)
+    positions = [rng.uniform(0, end) for _ in range(10000)]
+
+    def lookup():
+        for position in positions:
+            subtitles.text_at(position)
+    await runner.measure('subtitle_lookup', lookup, params={'cues': 5000, 'lookups': len(positions)},
+                         ops=len(positions))
+
+    def round_trip():
+        SubtitleTrack.from_bytes(subtitles.to_bytes())
+    await runner.measure('subtitle_serialize_round_trip', round_trip, number=10, params={'cues': 5000}, ops=5000)
+
+
+@benchmark
+async def bench_transcript_parse(runner, cog, bot):
+    snippets = make_subtitles(5000)
+
+    def parse():
+        SubtitleTrack.from_cues(cues_from_snippets(snippets))
+    await runner.measure('transcript_parse', parse, number=5, params={'cues': 5000}, ops=5000)
+
+
+@benchmark
+async def bench_vtt_parse(runner, cog, bot):
+    with open(os.path.join(FIXTURES, 'captions.en.vtt'), encoding='utf-8') as f:
+        lines = f.readlines()
+    size = sum(len(line.encode('utf-8')) for line in lines)
+    for merge in (False, True):
+        await runner.measure('vtt_parse', lambda: parse_captions(lines, merge=merge), number=10,
+                             params={'bytes': size, 'merge': merge}, ops=len(lines))
+
+
+@benchmark
+async def bench_queue_ops(runner, cog, bot):
+    count = 10000
+    tracks = make_tracks(count)
+    state = {}
+
+    def fresh():
+        player = GuildPlayer(1)
+        player.extend(tracks)
+        state['player'] = player
+
+    def empty():
+        state['player'] = GuildPlayer(1)
+
+    await runner.measure('queue_extend', lambda: state['player'].extend(tracks), params={'size': count},
+                         setup=empty, ops=count)
+
+    def push_pop():
+        player = state['player']
+        for track in tracks:
+            player.push(track)
+            player.pop_next()
+    await runner.measure('queue_push_pop', push_pop, params={'size': count}, setup=fresh, ops=count)
+
+    def remove_middle():
+        player = state['player']
+        for _ in range(100):
+            player.remove(len(player.queue) // 2)
+    await runner.measure('queue_remove_middle', remove_middle, params={'size': count, 'removes': 100},
+                         setup=fresh, ops=100)
+
+    await runner.measure('queue_shuffle', lambda: state['player'].shuffle(), params={'size': count},
+                         setup=fresh, ops=count)
+
+    def peek():
+        player = state['player']
+        for _ in range(1000):
+            player.peek(10)
+    await runner.measure('queue_peek', peek, params={'size': count, 'peeks': 1000}, setup=fresh, ops=1000)
+
+    def start_tracks():
+        # 곡 전환마다 이력 링 버퍼로 옮기는 경로
+        player = state['player']
+        for track in tracks[:1000]:
+            player.start(track)
+    await runner.measure('player_start', start_tracks, params={'tracks': 1000}, setup=empty, ops=1000)
+
+
+@benchmark
+async def bench_queue_embed(runner, cog, bot):
+    for size in (10, 10000):
+        player = GuildPlayer(1)
+        player.extend(make_tracks(size))
+        cog.players[1] = player
+        await runner.measure('get_queue_embed', lambda: cog.get_queue_embed(1), number=100, params={'size': size})
+    cog.players.clear()
+
+
+@benchmark
+async def bench_parse_song_info(runner, cog, bot):
+    info = load_fixture('info.json')
+    search = load_fixture('search.json')
+    await runner.measure('parse_song_info', lambda: cog.parse_song_info(info), number=10000)
+
+    def parse_search():
+        for entry in search['entries']:
+            cog.parse_flat_entry(entry)
+    await runner.measure('parse_flat_entry', parse_search, number=1000, params={'entries': len(search['entries'])},
+                         ops=len(search['entries']))
+
+    async def extract_and_parse():
+        cog.parse_song_info(await cog.extract('default', info['webpage_url'], 'stream'))
+    await runner.measure('extract_and_parse', extract_and_parse, number=1000)
+
+
+def metadata(repeat):
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        revision = None
+    return {
+        'revision': revision or None,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'discord.py': discord.__version__,
+        'repeat': repeat,
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """기준 결과 대비 중앙값 비율을 출력하고, threshold를 넘게 느려진 항목 수를 반환합니다."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {result_key(r): r for r in json.load(f)['results']}
+    regressions = 0
+    print(f"\n{'benchmark':<52} {'base':>11} {'now':>11} {'ratio':>7}", file=sys.stderr)
+    for record in results:
+        key = result_key(record)
+        base = baseline.get(key)
+        if not base:
+            continue
+        ratio = record['median_s'] / base['median_s'] if base['median_s'] else float('inf')
+        flag = ''
+        if ratio > threshold:
+            regressions += 1
+            flag = '  <-- slower'
+        print(f"{key:<52} {format_seconds(base['median_s']):>11} {format_seconds(record['median_s']):>11}"
+              f" {ratio:>6.2f}x{flag}", file=sys.stderr)
+    return regressions
+
+
+async def run(args):
+    loop = asyncio.get_running_loop()
+    bot = FakeBot(loop)
+    cog = Music(bot)
+    # 주기 작업은 벤치마크에서 직접 호출하므로 멈추고, 추출은 녹화된 결과를 돌려주는 대역으로 교체
+    cog.update_controller.cancel()
+    cog.extractor.shutdown()
+    cog.extractor = FakeExtractor({'default': load_fixture('info.json'), 'search': load_fixture('search.json')})
+
+    runner = Runner(args.repeat, args.k)
+    try:
+        for bench in BENCHMARKS:
+            await bench(runner, cog, bot)
+    finally:
+        await cog.cog_unload()
+    return runner.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="miniY offline microbenchmarks")
+    parser.add_argument('--repeat', type=int, default=7, help="측정 반복 횟수")
+    parser.add_argument('-k', metavar='PATTERN', help="이름에 PATTERN이 들어간 벤치마크만 실행")
+    parser.add_argument('--json', metavar='PATH', help="결과 JSON 저장 경로 ('-'면 stdout)")
+    parser.add_argument('--compare', metavar='PATH', help="비교할 이전 결과 JSON")
+    parser.add_argument('--threshold', type=float, default=1.25, help="느려짐으로 판단할 중앙값 비율")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run(args))
+        document = {'meta': metadata(args.repeat), 'results': results}
+        if args.json == '-':
+            json.dump(document, sys.stdout, indent=1)
+            print()
+        elif args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=1)
+
+        if args.compare and compare(results, args.compare, args.threshold):
+            sys.exit(1)
+    finally:
+        if TEMP_CACHE:
+            TEMP_CACHE.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+import os
+import sqlite3
+import time
+import asyncio
+import logging
+
+import aiohttp
+
+from .track_cache import CACHE_DIR, connect, is_stream_fresh
+
+logger = logging.getLogger('musicBot.audio_cache')
+
+# 오디오 파일 캐시 전체 크기 상한 (0이면 사용 안 함, 예: 2GB = 2147483648)
+AUDIO_CACHE_MAX_BYTES = int(os.getenv('MUSIC_AUDIO_CACHE_MAX_BYTES', '0'))
+# 이보다 긴 곡(초)은 저장하지 않음 (몇 시간짜리 영상이 캐시를 밀어내지 않도록)
+AUDIO_CACHE_MAX_DURATION = int(os.getenv('MUSIC_AUDIO_CACHE_MAX_DURATION', '900'))
+# 동시에 받는 곡 수
+AUDIO_CACHE_DOWNLOADS = int(os.getenv('MUSIC_AUDIO_CACHE_DOWNLOADS', '2'))
+# googlevideo는 Range 없이 받으면 재생 속도로 제한되므로 구간 단위로 받음
+DOWNLOAD_CHUNK_SIZE = 10 * 1024 * 1024
+# 받은 데이터를 이만큼 모아 이벤트 루프 밖에서 한 번에 파일에 씀
+WRITE_BUFFER_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=30)
+# 이보다 오래 수정되지 않은 임시 파일만 중단된 다운로드로 보고 정리 (다른 샤드 프로세스가 받는 중일 수 있으므로)
+STALE_PART_SECONDS = 600
+
+
+class AudioCache:
+    """자주 재생되는 곡의 원본 오디오 스트림을 video id별 파일로 보관하는 디스크 캐시.
+
+    재생이 시작된 곡을 백그라운드에서 내려받아 두고, 다음 재생부터는 네트워크 대신 로컬 파일을 FFmpeg에 넘깁니다.
+    전체 크기가 상한을 넘으면 가장 오래 재생되지 않은 파일부터 지웁니다.
+    """
+    def __init__(self, directory=None, max_bytes=AUDIO_CACHE_MAX_BYTES, max_duration=AUDIO_CACHE_MAX_DURATION):
+        self.directory = directory or os.path.join(CACHE_DIR, 'audio')
+        self.max_bytes = max_bytes
+        self.max_duration = max_duration
+        self.enabled = max_bytes > 0
+        self.downloads = {} # video id: 다운로드 작업
+        self.semaphore = asyncio.Semaphore(AUDIO_CACHE_DOWNLOADS)
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        if not self.enabled:
+            self.conn = None
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.conn = connect(os.path.join(CACHE_DIR, 'audio.sqlite3'))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS audio ("
+            "id TEXT PRIMARY KEY, acodec TEXT, size INTEGER NOT NULL, "
+            "plays INTEGER NOT NULL DEFAULT 0, accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS audio_accessed ON audio (accessed_at)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM audio").fetchone()[0]
+        # 내려받다 중단된 임시 파일 정리
+        stale_before = time.time() - STALE_PART_SECONDS
+        for name in os.listdir(self.directory):
+            if not name.endswith('.part'):
+                continue
+            try:
+                part = os.path.join(self.directory, name)
+                if os.path.getmtime(part) < stale_before:
+                    os.remove(part)
+            except FileNotFoundError:
+                pass
+
+    def _path(self, video_id):
+        return os.path.join(self.directory, f"{video_id}.audio")
+
+    def contains(self, video_id):
+        if not self.enabled or not video_id:
+            return False
+        row = self.conn.execute("SELECT 1 FROM audio WHERE id = ?", (video_id,)).fetchone()
+        return bool(row) and os.path.exists(self._path(video_id))
+
+    def cacheable(self, song):
+        """캐시에 저장될 수 있는 곡인지 (너무 긴 곡이나 id가 없는 곡은 제외)."""
+        return self.enabled and bool(song.id) and bool(song.duration) and song.duration <= self.max_duration
+
+    def open(self, song):
+        """캐시된 파일 경로와 코덱을 반환하고 재생 기록을 갱신합니다. 없으면 None.
+
+        재생할 곡마다 한 번 호출합니다. 애초에 저장 대상이 아닌 곡은 적중률 계산에서 뺍니다.
+        """
+        if not self.cacheable(song):
+            return None
+        video_id = song.id
+        row = self.conn.execute("SELECT acodec FROM audio WHERE id = ?", (video_id,)).fetchone()
+        path = self._path(video_id)
+        if not row or not os.path.exists(path):
+            self.misses += 1
+            return None
+        try:
+            self.conn.execute(
+                "UPDATE audio SET plays = plays + 1, accessed_at = ? WHERE id = ?", (time.time(), video_id)
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Audio cache write error: {e}")
+        self.hits += 1
+        return path, row[0]
+
+    def schedule_store(self, song):
+        """재생을 시작한 곡을 백그라운드에서 내려받아 캐시에 넣습니다."""
+        if not self.cacheable(song) or song.id in self.downloads or not is_stream_fresh(song):
+            return
+        if self.contains(song.id):
+            return
+        task = asyncio.create_task(self._store(song.id, song.url, song.acodec))
+        self.downloads[song.id] = task
+        task.add_done_callback(lambda _: self.downloads.pop(song.id, None))
+
+    async def _store(self, video_id, url, acodec):
+        path = self._path(video_id)
+        # 여러 샤드 프로세스가 같은 곡을 동시에 받아도 서로의 임시 파일을 덮어쓰지 않도록 pid를 붙임
+        part = f"{path}.{os.getpid()}.part"
+        try:
+            async with self.semaphore:
+                size = await self._download(url, part)
+            if size == 0 or size > self.max_bytes:
+                os.remove(part)
+                return
+            os.replace(part, path)
+            old = self.conn.execute("SELECT size FROM audio WHERE id = ?", (video_id,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO audio (id, acodec, size, plays, accessed_at) VALUES (?, ?, ?, 1, ?)",
+                (video_id, acodec, size, time.time())
+            )
+            self.total_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self.conn.commit()
+            logger.info(f"Cached audio {video_id} ({size / 1024 / 1024:.1f}MB, total {self.total_bytes / 1024 / 1024:.0f}MB)")
+        except asyncio.CancelledError:
+            if os.path.exists(part):
+                os.remove(part)
+            raise
+        except Exception as e:
+            logger.error(f"Audio cache download error ({video_id}): {e}")
+            if os.path.exists(part):
+                os.remove(part)
+
+    async def _download(self, url, part):
+        size = 0
+        async with aiohttp.ClientSession(timeout=DOWNLOAD_TIMEOUT) as session:
+            with open(part, 'wb') as f:
+                while True:
+                    headers = {'Range': f"bytes={size}-{size + DOWNLOAD_CHUNK_SIZE - 1}"}
+                    async with session.get(url, headers=headers) as resp:
+                        resp.raise_for_status()
+                        received = 0
+                        buffer = bytearray()
+                        async for chunk in resp.content.iter_chunked(64 * 1024):
+                            buffer += chunk
+                            received += len(chunk)
+                            if len(buffer) >= WRITE_BUFFER_SIZE:
+                                # 디스크 쓰기가 이벤트 루프를 막지 않도록 스레드에서 수행
+                                await asyncio.to_thread(f.write, bytes(buffer))
+                                buffer.clear()
+                        if buffer:
+                            await asyncio.to_thread(f.write, bytes(buffer))
+                    size += received
+                    if received < DOWNLOAD_CHUNK_SIZE or size > self.max_bytes:
+                        return size
+
+    def _evict(self):
+        # 다른 샤드 프로세스도 같은 디렉토리에 저장하므로 이 프로세스의 누적값 대신 실제 합계로 판단
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM audio").fetchone()[0]
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute("SELECT id, size FROM audio ORDER BY accessed_at LIMIT 16").fetchall()
+            if not rows:
+                break
+            for video_id, size in rows:
+                self.conn.execute("DELETE FROM audio WHERE id = ?", (video_id,))
+                try:
+                    os.remove(self._path(video_id))
+                except FileNotFoundError:
+                    pass
+                self.total_bytes -= size
+                if self.total_bytes <= self.max_bytes:
+                    break
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'bytes': self.total_bytes,
+            'downloads': len(self.downloads),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+    def close(self):
+        for task in self.downloads.values():
+            task.cancel()
+        if self.conn:
+            self.conn.close()
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('musicBot.executors')
+
+
+class ExecutorSaturated(Exception):
+    """실행기의 작업 수 상한에 도달해 요청을 바로 거절했을 때 발생합니다."""
+    def __init__(self, name):
+        super().__init__(f"{name} executor is saturated")
+        self.name = name
+
+
+class BoundedExecutor:
+    """작업 종류별로 따로 쓰는 크기 제한 스레드 풀.
+
+    기본 asyncio.to_thread 실행기를 모든 작업이 함께 쓰면 한 종류의 폭주가 다른 작업을 굶기므로 분리합니다.
+    실행 중 + 대기 중 작업이 workers + max_queue에 도달하면 기다리지 않고 ExecutorSaturated로 거절합니다.
+    """
+    def __init__(self, name, workers, max_queue):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"music-{name}")
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def run(self, func, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            logger.warning(f"{self.name} executor saturated ({self.in_flight} in flight), rejecting")
+            raise ExecutorSaturated(self.name)
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'in_flight': self.in_flight,
+            'queued': max(0, self.in_flight - self.workers),
+            'rejected': self.rejected
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,163 @@
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .executors import ExecutorSaturated
+
+logger = logging.getLogger('musicBot.extractor')
+
+# 추출 워커 프로세스 수와 요청별 최대 대기 시간 (초)
+EXTRACT_WORKERS = int(os.getenv('MUSIC_EXTRACT_WORKERS', '2'))
+EXTRACT_TIMEOUT = float(os.getenv('MUSIC_EXTRACT_TIMEOUT', '60'))
+# 워커를 기다리는 사용자 요청(검색/URL 추가)이 이만큼 쌓이면 새 요청은 바로 거절
+EXTRACT_MAX_QUEUE = int(os.getenv('MUSIC_EXTRACT_MAX_QUEUE', '16'))
+
+# 프로세스 간 전달 비용만 늘리고 봇에서는 쓰지 않는 항목
+_HEAVY_KEYS = ('formats', 'requested_formats', 'thumbnails', 'heatmap', 'fragments', 'subtitles', 'automatic_captions')
+# 자막 대체 경로에서 파싱할 수 있는 형식
+_CAPTION_EXTS = ('vtt', 'srt')
+
+# 아래 전역 변수는 워커 프로세스 안에서만 사용됨
+_profiles = {}
+_instances = {}
+
+
+def _init_worker(profiles):
+    """워커 프로세스 시작 시 프로필별 YoutubeDL 인스턴스를 미리 만들어 둡니다."""
+    global _profiles
+    _profiles = profiles
+    for name in profiles:
+        _get_ydl(name)
+
+
+def _get_ydl(profile):
+    ydl = _instances.get(profile)
+    if ydl is None:
+        import yt_dlp
+        ydl = yt_dlp.YoutubeDL(_profiles[profile])
+        _instances[profile] = ydl
+    return ydl
+
+
+def _pick_caption(info, langs):
+    """언어 우선순위대로 직접 등록된 자막, 없으면 자동 생성 자막의 VTT/SRT 주소 하나를 고릅니다.
+
+    (주소, 자동 생성 여부)를 반환합니다. 없으면 (None, False).
+    """
+    for lang in langs:
+        for key in ('subtitles', 'automatic_captions'):
+            for fmt in (info.get(key) or {}).get(lang) or ():
+                if fmt.get('ext') in _CAPTION_EXTS and fmt.get('url'):
+                    return fmt['url'], key == 'automatic_captions'
+    return None, False
+
+
+def _slim(info, langs=()):
+    if not isinstance(info, dict):
+        return info
+    # 수백 개 언어의 자막 목록 대신 쓸 주소 하나만 남김
+    if langs and (info.get('subtitles') or info.get('automatic_captions')):
+        info['caption_url'], info['caption_auto'] = _pick_caption(info, langs)
+    # 평면 추출 항목은 thumbnails 목록만 있으므로 대표 썸네일 하나만 남김
+    if not info.get('thumbnail') and info.get('thumbnails'):
+        info['thumbnail'] = info['thumbnails'][-1].get('url')
+    for key in _HEAVY_KEYS:
+        info.pop(key, None)
+    if info.get('entries'):
+        info['entries'] = [_slim(e) for e in info['entries'] if e]
+    return info
+
+
+def _extract(profile, url):
+    ydl = _get_ydl(profile)
+    info = ydl.extract_info(url, download=False)
+    return _slim(ydl.sanitize_info(info), _profiles[profile].get('subtitleslangs') or ())
+
+
+def _ping():
+    return os.getpid()
+
+
+class ExtractorPool:
+    """미리 초기화된 YoutubeDL 인스턴스를 가진 워커 프로세스 풀.
+
+    yt-dlp 파싱은 CPU를 많이 쓰고 GIL에 묶이므로 봇 이벤트 루프와 다른 프로세스에서 실행합니다.
+    워커가 죽어 풀이 깨지거나(BrokenProcessPool) 추출이 시간 초과로 워커를 붙잡고 있으면 풀을 새로 만듭니다.
+    """
+    def __init__(self, profiles, size=EXTRACT_WORKERS, max_queue=EXTRACT_MAX_QUEUE):
+        self.profiles = profiles
+        self.size = size
+        self.max_queue = max_queue
+        self.executor = self._create_executor()
+        self.in_flight = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def _create_executor(self):
+        # 이벤트 루프/감시 스레드가 이미 떠 있는 프로세스를 fork하면 잠긴 락이 복사될 수 있으므로 spawn 사용
+        return ProcessPoolExecutor(max_workers=self.size, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker, initargs=(self.profiles,))
+
+    def restart(self, executor, reason):
+        """executor가 아직 현재 풀이면 워커를 모두 종료하고 새 풀로 교체합니다.
+
+        같은 풀에서 여러 요청이 동시에 실패해도 한 번만 교체되도록 실패한 풀을 인자로 받습니다.
+        """
+        if executor is not self.executor:
+            return
+        self.restarts += 1
+        logger.warning(f"Restarting extractor pool ({reason})")
+        self.executor = self._create_executor()
+        # 멈춘 추출은 취소할 수 없으므로 프로세스를 직접 종료 (공개 API가 없어 내부 목록 사용)
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        # 대기 중인 요청은 취소하지 않음: 취소되면 CancelledError로 끝나지만,
+        # 그대로 두면 BrokenProcessPool로 실패해 extract의 재시도 경로에서 새 풀로 옮겨감
+        executor.shutdown(wait=False)
+
+    async def warmup(self):
+        """워커 프로세스를 미리 띄워 첫 요청에서 초기화 비용을 치르지 않게 합니다."""
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(loop.run_in_executor(self.executor, _ping) for _ in range(self.size)))
+        logger.info(f"Extractor pool ready: {len(set(pids))} workers")
+
+    async def extract(self, profile, url, timeout=EXTRACT_TIMEOUT, reject=True):
+        """reject=False는 재생 직전 스트림 주소 해석처럼 거절하면 곡이 끊기는 요청에 씁니다."""
+        if reject and self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            logger.warning(f"Extractor saturated ({self.queue_depth} queued), rejecting {profile}: {url}")
+            raise ExecutorSaturated('extract')
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            # 풀이 깨진 경우(다른 요청의 시간 초과로 교체된 경우 포함) 새 풀에서 한 번 더 시도
+            for attempt in range(2):
+                executor = self.executor
+                try:
+                    return await asyncio.wait_for(loop.run_in_executor(executor, _extract, profile, url), timeout)
+                except BrokenProcessPool:
+                    self.restart(executor, 'worker died')
+                    if attempt:
+                        raise
+                except asyncio.TimeoutError:
+                    logger.warning(f"Extraction timed out after {timeout}s ({profile}): {url}")
+                    # 시간 초과된 추출은 워커를 계속 붙잡고 있으므로 풀을 교체해 워커를 회수
+                    self.restart(executor, 'extraction timed out')
+                    raise
+        finally:
+            self.in_flight -= 1
+
+    @property
+    def queue_depth(self):
+        """워커를 기다리고 있는 요청 수."""
+        return max(0, self.in_flight - self.size)
+
+    def stats(self):
+        return {'workers': self.size, 'in_flight': self.in_flight, 'queued': self.queue_depth, 'rejected': self.rejected,
+                'restarts': self.restarts}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
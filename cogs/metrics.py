@@ -0,0 +1,179 @@
+import os
+import re
+import time
+import logging
+from bisect import bisect_left
+
+logger = logging.getLogger('musicBot.metrics')
+
+# Prometheus 형식 지표를 내보낼 주소 (포트 0이면 사용 안 함)
+METRICS_HOST = os.getenv('MUSIC_METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('MUSIC_METRICS_PORT', '0'))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def process_rss():
+    """현재 프로세스의 상주 메모리(RSS, 바이트). /proc이 없으면 최대 사용량으로 대신합니다."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, values)) + '}'
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+
+    def inc(self, *label_values, amount=1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def total(self):
+        return sum(self.values.values())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in self.values.items():
+            lines.append(f"{self.name}{_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """누적 버킷 방식의 Prometheus 히스토그램. 최근 값은 /상태 표시용으로 따로 보관합니다."""
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {} # 라벨 값: [버킷별 개수..., 합계, 개수]
+        self.last = {}
+
+    def observe(self, value, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+        self.last[label_values] = value
+
+    def mean(self, *label_values):
+        series = self.series.get(label_values)
+        return series[-2] / series[-1] if series and series[-1] else None
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), label_values + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), label_values + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+
+class RateLimitLogHandler(logging.Handler):
+    """discord.http 로그에서 429 응답을 잡아 콜백으로 넘기는 핸들러.
+
+    discord.py는 짧은 429를 직접 기다렸다가 재시도하고 예외 없이 경고 로그만 남기므로, 로그로만 셀 수 있습니다.
+    """
+    _MESSAGE_RE = re.compile(r'/channels/(\d+)/messages/(\d+)')
+
+    def __init__(self, on_rate_limit):
+        super().__init__(logging.WARNING)
+        self.on_rate_limit = on_rate_limit # (method, url, message_id 또는 None, retry_after)
+
+    def emit(self, record):
+        # 재시도하는 429만 셈 (max_ratelimit_timeout 초과로 예외가 나는 경우는 호출한 쪽에서 처리)
+        if 'responded with 429' not in str(record.msg) or 'Retrying in' not in str(record.msg):
+            return
+        try:
+            method, url, retry_after = record.args[:3]
+            match = self._MESSAGE_RE.search(str(url))
+            self.on_rate_limit(method, url, int(match.group(2)) if match else None, float(retry_after))
+        except Exception:
+            self.handleError(record)
+
+
+class MusicMetrics:
+    """음악 기능의 지연 시간/횟수 지표 모음과 Prometheus 텍스트 형식 HTTP 엔드포인트."""
+    def __init__(self):
+        self.extract_seconds = Histogram(
+            'musicbot_extract_seconds', 'yt-dlp extraction latency', labels=('kind',))
+        self.first_audio_seconds = Histogram(
+            'musicbot_time_to_first_audio_seconds', 'Time from play request to first audio frame')
+        self.transcript_fetch_seconds = Histogram(
+            'musicbot_transcript_fetch_seconds', 'Transcript API fetch latency (cache misses only)')
+        self.controller_tick_seconds = Histogram(
+            'musicbot_controller_tick_seconds', 'update_controller tick duration')
+        self.edit_seconds = Histogram(
+            'musicbot_progress_edit_seconds', 'Progress message edit latency')
+        self.loop_lag_seconds = Histogram(
+            'musicbot_event_loop_lag_seconds', 'Event loop scheduling delay', buckets=LATENCY_BUCKETS[:10])
+        self.rate_limited = Counter(
+            'musicbot_rate_limited_total', 'Discord 429 responses', labels=('route',))
+        self.idle_reclaims = Counter(
+            'musicbot_idle_reclaims_total', 'Guild players reclaimed by the idle policy', labels=('reason',))
+
+        self.loop_lag = 0.0
+        self.runner = None
+
+    def record_loop_lag(self, lag):
+        """LoopWatchdog가 측정한 이벤트 루프 지연을 기록합니다."""
+        self.loop_lag = lag
+        self.loop_lag_seconds.observe(lag)
+
+    def render(self, gauges):
+        """gauges: (이름, 설명, 값) 목록. 스크랩 시점에 계산한 현재 상태 값입니다."""
+        lines = []
+        for metric in (self.extract_seconds, self.first_audio_seconds, self.transcript_fetch_seconds,
+                       self.controller_tick_seconds, self.edit_seconds, self.loop_lag_seconds, self.rate_limited,
+                       self.idle_reclaims):
+            lines.extend(metric.render())
+        for name, help, value in gauges:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+    async def start(self, collect, host=METRICS_HOST, port=METRICS_PORT):
+        """collect()가 반환하는 현재 상태 값과 함께 /metrics를 제공합니다."""
+        if not port:
+            return
+        # 지표 서버를 쓸 때만 필요한 모듈이므로 시작 경로에서 불필요하게 불러오지 않음
+        from aiohttp import web
+
+        async def handle(request):
+            started = time.perf_counter()
+            body = self.render(collect())
+            logger.debug(f"Metrics rendered in {time.perf_counter() - started:.4f}s")
+            return web.Response(text=body, content_type='text/plain', charset='utf-8')
+
+        app = web.Application()
+        app.router.add_get('/metrics', handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        try:
+            await web.TCPSite(self.runner, host, port).start()
+            logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+        except OSError as e:
+            logger.error(f"Metrics endpoint failed to start on {host}:{port}: {e}")
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
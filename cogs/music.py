@@ -1,12 +1,23 @@
 import discord
 import asyncio
 import os
-import yt_dlp
 import logging
 import time
 import aiohttp
-import re
 from discord.ext import commands, tasks
+from .track_cache import TrackCache, extract_video_id, is_stream_fresh
+from .subtitles import SubtitleTrack, SUBTITLE_LEAD, cues_from_snippets
+from .subtitle_parser import parse_caption_stream
+from .extractor import ExtractorPool
+from .search_cache import SearchCache
+from .transcript_cache import TranscriptCache
+from .player import GuildPlayer, Track
+from .session_store import SessionStore
+from .prewarm import PrewarmedSource
+from .audio_cache import AudioCache
+from .metrics import MusicMetrics, RateLimitLogHandler, process_rss
+from .executors import BoundedExecutor, ExecutorSaturated
+from .watchdog import LoopWatchdog
 
 logger = logging.getLogger('musicBot.music')
 
@@ -38,12 +49,70 @@ YDL_OPTIONS = {
 if os.path.exists('cookies.txt'):
     YDL_OPTIONS['cookiefile'] = 'cookies.txt'
 
+# 추출 워커가 미리 만들어 두는 YoutubeDL 프로필
+EXTRACT_PROFILES = {
+    # 단일 영상
+    'default': YDL_OPTIONS,
+    # 검색: id/제목/길이만 평면 추출하고, 사용자가 고른 곡만 재생 직전에 스트림 주소를 해석
+    'search': {**YDL_OPTIONS, 'extract_flat': True},
+    # URL 재생: 재생목록은 평면 추출만 하고, 각 곡의 스트림 주소는 재생 직전에 resolve_stream에서 해석
+    'url': {**YDL_OPTIONS, 'noplaylist': False, 'extract_flat': 'in_playlist'},
+}
+
 # FFmpeg 옵션 설정
 FFMPEG_OPTIONS = {
     'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
     'options': '-vn'
 }
 
+# 현재 곡 종료 몇 초 전에 다음 곡(스트림 주소, 프로브, 자막)을 미리 준비할지
+PREFETCH_SECONDS = int(os.getenv('MUSIC_PREFETCH_SECONDS', '15'))
+# 자막 로딩 최대 대기 시간 (초과 시 자막 없이 재생 유지)
+SUBTITLE_TIMEOUT = float(os.getenv('MUSIC_SUBTITLE_TIMEOUT', '10'))
+# 자막 API 전용 스레드 수와 대기 상한 (넘으면 해당 곡은 자막 없이 재생)
+TRANSCRIPT_WORKERS = int(os.getenv('MUSIC_TRANSCRIPT_WORKERS', '4'))
+TRANSCRIPT_MAX_QUEUE = int(os.getenv('MUSIC_TRANSCRIPT_MAX_QUEUE', '16'))
+# 진행바 편집 동시 전송 수와 초당 전체 편집 예산 (Discord 전역 제한 50req/s 이하로 유지)
+EDIT_CONCURRENCY = int(os.getenv('MUSIC_EDIT_CONCURRENCY', '10'))
+EDIT_RATE_PER_SECOND = float(os.getenv('MUSIC_EDIT_RATE', '30'))
+# 429 응답에 retry_after 정보가 없을 때 해당 서버의 편집을 쉬는 시간 (초)
+RATE_LIMIT_BACKOFF = 5.0
+# 타임라인 모드에서 편집 사이 최소 간격과, 변화가 없어도 시간 표시를 갱신하는 최대 대기 시간 (초)
+TIMELINE_MIN_GAP = 1.0
+TIMELINE_MAX_SLEEP = float(os.getenv('MUSIC_TIMELINE_MAX_SLEEP', '30'))
+# 다음 곡 FFmpeg를 미리 띄워 둘 때 버퍼에 담아 둘 첫 Opus 프레임 수(20ms 단위, 0이면 사용 안 함)와
+# 동시에 미리 띄워 둘 수 있는 FFmpeg 프로세스 수 (서버 수가 많을 때 프로세스/메모리 상한)
+PREWARM_FRAMES = int(os.getenv('MUSIC_PREWARM_FRAMES', '25'))
+PREWARM_MAX_SOURCES = int(os.getenv('MUSIC_PREWARM_MAX_SOURCES', '4'))
+# 재시작 후 이어 재생할 수 있도록 재생 위치를 기록하는 간격 (초)
+SESSION_SAVE_INTERVAL = int(os.getenv('MUSIC_SESSION_SAVE_INTERVAL', '10'))
+# 재시작 직후 동시에 음성 채널에 재접속하는 서버 수
+RESTORE_CONCURRENCY = int(os.getenv('MUSIC_RESTORE_CONCURRENCY', '3'))
+# 대기열 추가 후 컨트롤러를 다시 출력하기 전 기다리는 시간 (초). 이 안의 추가는 한 번의 재출력으로 묶음
+CONTROLLER_REPOST_DELAY = float(os.getenv('MUSIC_CONTROLLER_REPOST_DELAY', '2'))
+# 일괄 추가 한 번에 받을 수 있는 항목 수와 동시에 해석하는 항목 수
+BULK_MAX_ITEMS = int(os.getenv('MUSIC_BULK_MAX_ITEMS', '30'))
+BULK_CONCURRENCY = int(os.getenv('MUSIC_BULK_CONCURRENCY', '3'))
+# 유휴 회수 정책 (분, 0이면 사용 안 함): 음성 채널에 청취자가 없을 때 / 재생 없이 대기할 때 연결을 끊고 서버 상태를 메모리에서 내림
+IDLE_EMPTY_MINUTES = float(os.getenv('MUSIC_IDLE_EMPTY_MINUTES', '3'))
+IDLE_QUEUE_MINUTES = float(os.getenv('MUSIC_IDLE_QUEUE_MINUTES', '10'))
+# 유휴 상태 확인 주기 (초)
+IDLE_CHECK_INTERVAL = 30
+
+class RestoredContext:
+    """재시작 후 복원 재생에 쓰는 최소한의 ctx 대용 객체 (명령어 없이 play_music을 호출하기 위함)"""
+    def __init__(self, guild, channel):
+        self.guild = guild
+        self.channel = channel
+        self.author = guild.me
+
+    @property
+    def voice_client(self):
+        return self.guild.voice_client
+
+    async def send(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
 class MusicSearchView(discord.ui.View):
     """유튜브 검색 결과를 보여주고 선택할 수 있는 뷰"""
     def __init__(self, cog, ctx, results):
@@ -85,9 +154,8 @@ class QueueView(discord.ui.View):
 
     @discord.ui.button(label="🗑️ 삭제", style=discord.ButtonStyle.danger)
     async def delete_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        guild_id = interaction.guild_id
-        queue = self.cog.queue.get(guild_id, [])
-        if not queue:
+        player = self.cog.get_player(interaction.guild_id)
+        if not player.queue:
             return await interaction.response.edit_message(content="대기열이 비어 있습니다.", embed=None, view=None)
             
         view = QueueDeleteView(self.cog, self.ctx)
@@ -95,13 +163,13 @@ class QueueView(discord.ui.View):
 
     @discord.ui.button(label="🔀 셔플", style=discord.ButtonStyle.primary)
     async def shuffle_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        import random
         guild_id = interaction.guild_id
-        queue = self.cog.queue.get(guild_id, [])
-        if not queue:
+        player = self.cog.get_player(guild_id)
+        if not player.queue:
             return await interaction.response.edit_message(content="대기열이 비어 있습니다.", embed=None, view=None)
             
-        random.shuffle(queue)
+        player.shuffle()
+        player.cancel_prefetch()
         
         embed = self.cog.get_queue_embed(guild_id)
         await interaction.response.edit_message(content="🔀 대기열이 랜덤하게 섞였습니다!", embed=embed, view=self)
@@ -115,10 +183,9 @@ class QueueDeleteView(discord.ui.View):
         
     def update_buttons(self):
         self.clear_items()
-        guild_id = self.ctx.guild.id
-        queue = self.cog.queue.get(guild_id, [])
+        player = self.cog.get_player(self.ctx.guild.id)
         
-        for i in range(min(10, len(queue))):
+        for i in range(min(10, len(player.queue))):
             btn = discord.ui.Button(label=str(i+1), style=discord.ButtonStyle.danger, custom_id=f"del_{i}")
             btn.callback = self.make_callback(i)
             self.add_item(btn)
@@ -130,15 +197,16 @@ class QueueDeleteView(discord.ui.View):
     def make_callback(self, index):
         async def callback(interaction: discord.Interaction):
             guild_id = interaction.guild_id
-            queue = self.cog.queue.get(guild_id, [])
-            if index < len(queue):
-                removed = queue.pop(index)
+            player = self.cog.get_player(guild_id)
+            if index < len(player.queue):
+                removed = player.remove(index)
+                player.cancel_prefetch()
                 self.update_buttons()
                 embed = self.cog.get_queue_embed(guild_id)
-                if len(queue) == 0:
-                    await interaction.response.edit_message(content=f"🗑️ `{removed['title']}` 곡을 삭제했습니다. 대기열이 비어 있습니다.", embed=None, view=None)
+                if not player.queue:
+                    await interaction.response.edit_message(content=f"🗑️ `{removed.title}` 곡을 삭제했습니다. 대기열이 비어 있습니다.", embed=None, view=None)
                 else:
-                    await interaction.response.edit_message(content=f"🗑️ `{removed['title']}` 곡을 삭제했습니다.", embed=embed, view=self)
+                    await interaction.response.edit_message(content=f"🗑️ `{removed.title}` 곡을 삭제했습니다.", embed=embed, view=self)
             else:
                 await interaction.response.send_message("유효하지 않은 번호입니다.", ephemeral=True)
         return callback
@@ -158,22 +226,21 @@ class MusicPlayerView(discord.ui.View):
 
     @discord.ui.button(label="⏮️ 이전곡", style=discord.ButtonStyle.secondary)
     async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        guild_id = interaction.guild_id
-        history = self.cog.history.get(guild_id, [])
+        player = self.cog.get_player(interaction.guild_id)
         
-        if not history:
+        if not player.history:
             return await interaction.response.send_message("이전 곡 기록이 없습니다.", ephemeral=True)
         
         vc = interaction.guild.voice_client
         if vc and (vc.is_playing() or vc.is_paused()):
             # 현재 곡을 대기열 맨 앞으로 보냄 (원한다면)
             # 여기서는 단순히 이전 곡을 재생하는 로직
-            prev_song = history.pop()
-            current_song = self.cog.current_song.get(guild_id)
-            if current_song:
-                self.cog.queue[guild_id].insert(0, current_song)
+            prev_song = player.pop_history()
+            if player.current:
+                player.push_front(player.current)
             
-            self.cog.queue[guild_id].insert(0, prev_song)
+            player.push_front(prev_song)
+            player.cancel_prefetch()
             vc.stop() # after_playing이 호출되면서 다음 곡(여기서는 이전 곡) 재생
             await interaction.response.send_message("⏮️ 이전 곡으로 돌아갑니다.", ephemeral=True)
         else:
@@ -182,19 +249,21 @@ class MusicPlayerView(discord.ui.View):
     @discord.ui.button(label="⏯️ 재생/일시정지", style=discord.ButtonStyle.primary)
     async def toggle_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         vc = interaction.guild.voice_client
-        guild_id = interaction.guild_id
+        player = self.cog.get_player(interaction.guild_id)
         if not vc:
             return await interaction.response.send_message("음성 채널에 있지 않습니다.", ephemeral=True)
             
         if vc.is_playing():
             vc.pause()
-            self.cog.pause_times[guild_id] = time.time()
+            player.pause()
+            self.cog.save_position(player)
+            self.cog.reschedule_timeline(player)
             await interaction.response.send_message("⏸️ 일시정지되었습니다.", ephemeral=True)
         elif vc.is_paused():
             vc.resume()
-            if self.cog.pause_times.get(guild_id):
-                self.cog.pause_durations[guild_id] += time.time() - self.cog.pause_times[guild_id]
-                self.cog.pause_times[guild_id] = 0
+            player.resume()
+            self.cog.save_position(player)
+            self.cog.reschedule_timeline(player)
             await interaction.response.send_message("▶️ 재생을 재개합니다.", ephemeral=True)
         else:
             await interaction.response.send_message("재생 중인 곡이 없습니다.", ephemeral=True)
@@ -211,9 +280,9 @@ class MusicPlayerView(discord.ui.View):
     @discord.ui.button(label="📋 대기열", style=discord.ButtonStyle.secondary)
     async def queue_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         guild_id = interaction.guild_id
-        queue = self.cog.queue.get(guild_id, [])
+        player = self.cog.get_player(guild_id)
         
-        if not queue:
+        if not player.queue:
             return await interaction.response.send_message("대기열이 비어 있습니다.", ephemeral=True)
             
         embed = self.cog.get_queue_embed(guild_id)
@@ -223,44 +292,302 @@ class MusicPlayerView(discord.ui.View):
 class Music(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.queue = {} # guild_id: [songs]
-        self.history = {} # guild_id: [played_songs]
-        self.current_song = {} # guild_id: song
-        self.is_playing = {}
-        self.last_controller_msg = {} # guild_id: discord.Message
-        self.last_progress_msg = {} # guild_id: discord.Message
-        
-        self.start_times = {} # guild_id: start_time (float)
-        self.pause_times = {} # guild_id: pause_time (float)
-        self.pause_durations = {} # guild_id: total_pause_duration (float)
-        self.subtitles = {} # guild_id: list of subtitle dicts
+        self.players = {} # guild_id: GuildPlayer (대기열, 이력, 현재 곡, 진행 시간, 메시지 등 서버별 상태)
+
+        self.track_cache = TrackCache() # video id 기준 곡 정보/스트림 주소 캐시
+        self.extractor = ExtractorPool(EXTRACT_PROFILES) # yt-dlp 추출 전용 워커 프로세스 풀
+        self.search_cache = SearchCache() # 검색어 → 검색 결과 LRU 캐시
+        self.search_refreshes = {} # 정규화된 검색어: 백그라운드 갱신 작업
+        self.transcript_cache = TranscriptCache() # video id별 자막 디스크 캐시 (자막 없음 포함)
+        self.transcript_api = None # 재사용하는 YouTubeTranscriptApi 인스턴스
+        self.session_store = SessionStore() # 재시작 후 복원용 대기열/재생 위치 기록
+        self.audio_cache = AudioCache() # 자주 재생되는 곡의 오디오 파일 캐시 (MUSIC_AUDIO_CACHE_MAX_BYTES로 활성화)
+        self.restored = False # on_ready는 재연결마다 호출되므로 복원은 한 번만 수행
+        self.edit_semaphore = asyncio.Semaphore(EDIT_CONCURRENCY)
+        self.prewarmed = 0 # 미리 띄워 둔 FFmpeg 소스 수
+        self.metrics = MusicMetrics() # 지연 시간/횟수 지표 (MUSIC_METRICS_PORT로 HTTP 노출)
+        self.watchdog = LoopWatchdog(on_sample=self.metrics.record_loop_lag) # 이벤트 루프 지연 감시
+        self.rate_limit_handler = RateLimitLogHandler(self.on_rate_limit) # discord.py가 내부에서 재시도하는 429 집계
+        # 작업 종류별 전용 실행기 (한 종류가 몰려도 다른 작업이 굶지 않도록 분리)
+        self.transcript_executor = BoundedExecutor('transcript', TRANSCRIPT_WORKERS, TRANSCRIPT_MAX_QUEUE)
+        self.audio_executor = BoundedExecutor('audio', max(1, PREWARM_MAX_SOURCES), 0) # 미리 띄운 FFmpeg 첫 프레임 읽기
 
         self.update_controller.start()
 
-    def cog_unload(self):
+    async def cog_load(self):
+        # 워커 프로세스는 봇 시작을 막지 않도록 백그라운드에서 띄움
+        self.warmup_task = asyncio.create_task(self.extractor.warmup())
+        self.import_task = asyncio.create_task(self.preload_transcript_api())
+        self.watchdog.start()
+        self.reclaim_idle.start()
+        logging.getLogger('discord.http').addHandler(self.rate_limit_handler)
+        await self.metrics.start(self.collect_gauges)
+
+    async def cog_unload(self):
         self.update_controller.cancel()
+        self.reclaim_idle.cancel()
+        logging.getLogger('discord.http').removeHandler(self.rate_limit_handler)
+        self.watchdog.stop()
+        await self.metrics.stop()
+        for player in self.players.values():
+            player.release()
+        self.track_cache.close()
+        self.transcript_cache.close()
+        self.session_store.close()
+        self.audio_cache.close()
+        self.extractor.shutdown()
+        self.transcript_executor.shutdown()
+        self.audio_executor.shutdown()
+
+    def load_transcript_api(self):
+        """YouTubeTranscriptApi 인스턴스를 만들어 재사용합니다. 임포트가 무거우므로 실행기 스레드에서 호출합니다."""
+        if self.transcript_api is None:
+            from youtube_transcript_api import YouTubeTranscriptApi
+            self.transcript_api = YouTubeTranscriptApi()
+        return self.transcript_api
+
+    async def preload_transcript_api(self):
+        """시작 직후 백그라운드에서 자막 라이브러리를 미리 불러 첫 곡의 자막 로딩이 임포트를 기다리지 않게 합니다."""
+        started = time.perf_counter()
+        try:
+            await self.transcript_executor.run(self.load_transcript_api)
+            logger.info(f"Transcript API preloaded in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logger.warning(f"Transcript API preload failed: {e}")
+
+    def on_rate_limit(self, method, url, message_id, retry_after):
+        """discord.py가 429를 받고 재시도할 때 호출됩니다. 진행바 편집이면 해당 서버의 편집을 잠시 쉽니다."""
+        if method == 'PATCH' and message_id is not None:
+            for player in self.players.values():
+                if player.progress_msg and player.progress_msg.id == message_id:
+                    self.metrics.rate_limited.inc('progress_edit')
+                    player.edit_backoff = time.monotonic() + retry_after
+                    return
+        self.metrics.rate_limited.inc(method.lower())
+
+    def collect_gauges(self):
+        """지표 엔드포인트/상태 명령어용 현재 상태 값: (이름, 설명, 값) 목록."""
+        queue_lengths = [len(player.queue) for player in self.players.values()]
+        gauges = [
+            ('musicbot_voice_clients', 'Connected voice clients', len(self.bot.voice_clients)),
+            ('musicbot_players', 'Guild players in memory', len(self.players)),
+            ('musicbot_queued_tracks', 'Tracks queued across all guilds', sum(queue_lengths)),
+            ('musicbot_queue_length_max', 'Longest guild queue', max(queue_lengths, default=0)),
+            ('musicbot_event_loop_lag_current_seconds', 'Most recent event loop lag sample', self.metrics.loop_lag),
+            ('musicbot_controller_interval_seconds', 'update_controller interval', self.update_controller.seconds),
+            ('musicbot_prewarmed_sources', 'Pre-spawned FFmpeg sources', self.prewarmed),
+            ('musicbot_event_loop_stalls', 'Event loop stalls caught by the watchdog', self.watchdog.stalls),
+            ('musicbot_process_rss_bytes', 'Resident memory of this process', process_rss()),
+        ]
+        for name, stats in (('extractor', self.extractor.stats()),
+                            ('transcript_executor', self.transcript_executor.stats()),
+                            ('audio_executor', self.audio_executor.stats()),
+                            ('track_cache', self.track_cache.stats()),
+                            ('search_cache', self.search_cache.stats()), ('transcript_cache', self.transcript_cache.stats()),
+                            ('audio_cache', self.audio_cache.stats())):
+            for key, value in stats.items():
+                gauges.append((f"musicbot_{name}_{key}", f"{name} {key}", value))
+        return gauges
+
+    async def extract(self, profile, url, kind, reject=True):
+        """추출 워커 풀 호출에 지연 시간 측정을 더한 것. url 프로필은 결과에 따라 url/playlist로 구분합니다."""
+        started = time.perf_counter()
+        info = await self.extractor.extract(profile, url, reject=reject)
+        if kind == 'url' and info.get('entries') is not None:
+            kind = 'playlist'
+        self.metrics.extract_seconds.observe(time.perf_counter() - started, kind)
+        return info
+
+    def get_player(self, guild_id):
+        player = self.players.get(guild_id)
+        if player is None:
+            player = self.players[guild_id] = GuildPlayer(guild_id, store=self.session_store)
+            # 저장된 대기열/이력과 설정은 해당 서버에서 처음 필요해질 때 불러옴 (유휴 회수 후에도 이어짐)
+            player.load(*self.session_store.load(guild_id))
+            player.timeline = self.session_store.load_settings(guild_id)['timeline']
+        return player
+
+    def evict_player(self, guild_id):
+        """서버 상태를 메모리에서 내립니다. 대기열/이력은 세션 기록에 남아 있어 다음 요청 때 다시 불러옵니다."""
+        player = self.players.pop(guild_id, None)
+        if player is None:
+            return None
+        if player.current:
+            # 재생 중이던 곡은 다음에 이어서 들을 수 있도록 대기열 맨 앞으로 되돌림
+            player.push_front(player.current)
+            player.current = None
+        player.is_playing = False
+        self.session_store.end_current(guild_id)
+        player.release()
+        return player
+
+    async def reclaim_guild(self, guild_id, reason):
+        """유휴 서버의 음성 연결(FFmpeg, UDP)을 끊고 서버 상태를 회수합니다."""
+        player = self.evict_player(guild_id)
+        guild = self.bot.get_guild(guild_id)
+        vc = guild.voice_client if guild else None
+        if vc:
+            # 플레이어를 먼저 내렸으므로 재생 중단으로 호출되는 after 콜백은 다음 곡을 재생하지 않음
+            await vc.disconnect(force=True)
+        self.metrics.idle_reclaims.inc(reason)
+        logger.info(f"Reclaimed guild {guild_id} ({reason})")
+
+        channel = player.controller_msg.channel if player and player.controller_msg else None
+        if vc and channel:
+            message = ("👋 음성 채널에 아무도 없어 연결을 종료했습니다." if reason == 'empty_channel'
+                       else "👋 한동안 재생이 없어 연결을 종료했습니다.")
+            try:
+                await channel.send(f"{message} 남은 대기열은 다음 재생 때 이어집니다.", delete_after=60)
+            except discord.HTTPException:
+                pass
+
+    @tasks.loop(seconds=IDLE_CHECK_INTERVAL)
+    async def reclaim_idle(self):
+        """청취자가 없는 채널이나 오래 재생이 없는 서버의 음성 연결과 메모리 상태를 회수합니다."""
+        now = time.monotonic()
+        for guild_id, player in list(self.players.items()):
+            guild = self.bot.get_guild(guild_id)
+            vc = guild.voice_client if guild else None
+
+            listeners = [m for m in vc.channel.members if not m.bot] if vc and vc.channel else None
+            if listeners == []:
+                player.empty_since = player.empty_since or now
+            else:
+                player.empty_since = 0.0
+
+            # 실제로 재생/일시정지 중일 때만 사용 중으로 봄. 음성 연결이 없으면 is_playing이 남아 있어도 유휴로 처리
+            # (음성에서 강제로 나가진 뒤 남은 플레이어도 회수되도록)
+            busy = bool(vc) and (vc.is_playing() or vc.is_paused())
+            player.idle_since = 0.0 if busy else (player.idle_since or now)
+
+            try:
+                if IDLE_EMPTY_MINUTES > 0 and player.empty_since and now - player.empty_since >= IDLE_EMPTY_MINUTES * 60:
+                    await self.reclaim_guild(guild_id, 'empty_channel')
+                elif IDLE_QUEUE_MINUTES > 0 and player.idle_since and now - player.idle_since >= IDLE_QUEUE_MINUTES * 60:
+                    await self.reclaim_guild(guild_id, 'idle' if vc else 'evict')
+            except Exception as e:
+                logger.error(f"Idle reclaim error for guild {guild_id}: {e}")
+
+    @reclaim_idle.before_loop
+    async def before_reclaim_idle(self):
+        await self.bot.wait_until_ready()
+
+    def save_position(self, player):
+        if player.current:
+            self.session_store.save_position(player.guild_id, player.elapsed())
+        player.saved_at = time.time()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if self.restored:
+            return
+        self.restored = True
+        # 세션 기록은 모든 샤드 프로세스가 공유하므로 이 프로세스가 맡은 서버만 복원
+        sessions = [session for session in self.session_store.active_sessions() if self.owns_guild(session[0])]
+        if not sessions:
+            return
+        logger.info(f"Restoring {len(sessions)} session(s) from previous run")
+        semaphore = asyncio.Semaphore(RESTORE_CONCURRENCY)
+
+        async def _restore(session):
+            async with semaphore:
+                await self.restore_session(*session)
+        await asyncio.gather(*(_restore(session) for session in sessions))
+
+    def owns_guild(self, guild_id):
+        """샤드를 여러 프로세스로 나눠 실행할 때 이 프로세스가 맡은 서버인지 확인합니다."""
+        shard_count = self.bot.shard_count
+        if not shard_count:
+            return True
+        shard_ids = getattr(self.bot, 'shard_ids', None) or range(shard_count)
+        return (guild_id >> 22) % shard_count in shard_ids
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        """봇이 서버에서 나가면 그 서버의 메모리 상태와 저장된 대기열/이력을 정리합니다."""
+        player = self.players.pop(guild.id, None)
+        if player:
+            player.release()
+        self.session_store.forget(guild.id)
+        logger.info(f"Removed from guild {guild.id}, cleared its session")
+
+    async def restore_session(self, guild_id, voice_channel_id, text_channel_id, song, position):
+        """재시작 직전에 재생 중이던 서버에 다시 접속해 저장된 위치부터 이어서 재생합니다."""
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            # 서버 장애로 잠시 보이지 않는 경우일 수 있으므로 기록은 지우지 않고 재생 중이던 곡만 대기열로 되돌림
+            # (봇이 실제로 서버에서 나간 경우의 정리는 on_guild_remove에서 수행)
+            self.session_store.push_front(guild_id, song)
+            self.session_store.end_current(guild_id)
+            return
+
+        player = self.get_player(guild_id)
+        voice_channel = guild.get_channel(voice_channel_id)
+        text_channel = guild.get_channel(text_channel_id)
+        listeners = [m for m in voice_channel.members if not m.bot] if voice_channel else []
+        if not text_channel or not listeners or guild.voice_client:
+            # 듣는 사람이 없으면 재접속하지 않고, 재생 중이던 곡을 대기열 맨 앞으로 돌려 둠
+            player.push_front(song)
+            self.session_store.end_current(guild_id)
+            return
+
+        try:
+            await voice_channel.connect()
+            # 메타데이터는 저장된 값을 그대로 쓰고, 만료된 스트림 주소는 play_music에서 다시 해석
+            await self.play_music(RestoredContext(guild, text_channel), song, start_at=position)
+            logger.info(f"Restored session for guild {guild_id} at {position:.0f}s ({song.title})")
+        except Exception as e:
+            logger.error(f"Session restore error (guild {guild_id}): {e}")
+            player.is_playing = False
+            if guild.voice_client:
+                await guild.voice_client.disconnect()
+            if player.current is not song:
+                player.push_front(song)
+            self.session_store.end_current(guild_id)
 
     def get_queue_embed(self, guild_id):
-        queue = self.queue.get(guild_id, [])
+        player = self.get_player(guild_id)
         embed = discord.Embed(title="📋 현재 대기열", color=discord.Color.blue())
-        if not queue:
+        if not player.queue:
             embed.description = "대기열이 비어 있습니다."
             return embed
             
         desc = ""
-        for i, song in enumerate(queue[:10], 1):
-            desc += f"{i}. {song['title']}\n"
-        if len(queue) > 10:
-            desc += f"...외 {len(queue)-10}곡"
+        for i, song in enumerate(player.peek(10), 1):
+            desc += f"{i}. {song.title}\n"
+        if len(player.queue) > 10:
+            desc += f"...외 {len(player.queue)-10}곡"
         
         embed.description = desc
         return embed
 
+    def render_progress(self, song, elapsed, subs):
+        """진행바, 시간 문자열, 현재 자막을 계산합니다. 같은 결과면 메시지를 다시 편집하지 않습니다."""
+        duration = song.duration
+        if duration and int(duration) > 0:
+            duration_int = int(duration)
+            progress = int((elapsed / duration_int) * 15)
+            progress = max(0, min(15, progress))
+            bar = "▬" * progress + "🔘" + "▬" * (15 - progress)
+            time_str = f"{self.format_duration(elapsed)} / {self.format_duration(duration_int)}"
+        else:
+            bar = "🔘▬▬▬▬▬▬▬▬▬▬▬▬▬▬"
+            time_str = f"{self.format_duration(elapsed)}"
+
+        current_sub = subs.text_at(elapsed) if subs else ""
+        return bar, time_str, current_sub
+
     @tasks.loop(seconds=2)
     async def update_controller(self):
+        now = time.monotonic()
         try:
-            for guild_id, prog_msg in list(self.last_progress_msg.items()):
-                if not self.is_playing.get(guild_id):
+            pending = {}
+            in_flight = 0
+            for guild_id, player in list(self.players.items()):
+                if player.edit_task:
+                    in_flight += 1
+                prog_msg = player.progress_msg
+                if not prog_msg or not player.is_playing:
                     continue
                     
                 guild = self.bot.get_guild(guild_id)
@@ -269,118 +596,384 @@ class Music(commands.Cog):
                 if not vc or (not vc.is_playing() and not vc.is_paused()):
                     continue
                     
-                song = self.current_song.get(guild_id)
+                song = player.current
                 if not song:
                     continue
                     
-                start_time = self.start_times.get(guild_id, 0)
-                pause_duration = self.pause_durations.get(guild_id, 0)
-                if self.pause_times.get(guild_id):
-                    elapsed = self.pause_times[guild_id] - start_time - pause_duration
-                else:
-                    elapsed = time.time() - start_time - pause_duration
-                    
-                duration = song.get('duration')
-                if duration and int(duration) > 0:
-                    duration_int = int(duration)
-                    progress = int((elapsed / duration_int) * 15)
-                    progress = max(0, min(15, progress))
-                    bar = "▬" * progress + "🔘" + "▬" * (15 - progress)
-                    time_str = f"{self.format_duration(elapsed)} / {self.format_duration(duration_int)}"
-                else:
-                    bar = "🔘▬▬▬▬▬▬▬▬▬▬▬▬▬▬"
-                    time_str = f"{self.format_duration(elapsed)}"
-                    
-                current_sub = ""
-                subs = self.subtitles.get(guild_id, [])
-                for sub in subs:
-                    # 시작 시간이 도달한 자막 중 가장 마지막 것을 계속 표시함(음악만 나오는 구간 등에서도 화면에 유지)
-                    if sub['start'] - 1.0 <= elapsed:
-                        current_sub = sub['text']
-                    else:
-                        break
-                        
-                if not prog_msg.embeds:
+                elapsed = player.elapsed()
+                duration = song.duration
+                if time.time() - player.saved_at >= SESSION_SAVE_INTERVAL:
+                    self.save_position(player)
+                # 곡이 끝나기 직전이면 다음 곡을 백그라운드에서 미리 준비
+                if duration and int(duration) > 0 and int(duration) - elapsed <= PREFETCH_SECONDS:
+                    self.schedule_prefetch(player)
+
+                # 타임라인 모드 서버는 run_timeline이 직접 편집함
+                if player.timeline or not prog_msg.embeds:
                     continue
-                embed = prog_msg.embeds[0].copy()
-                
-                # Update progress field (it should be the first field)
-                embed.set_field_at(0, name="재생 진행도", value=f"`{bar}`\n⏳ {time_str}", inline=False)
-                
-                if current_sub:
-                    embed.description = f"💬 **자막:**\n{current_sub}"
-                else:
-                    embed.description = ""
-                    
-                try:
-                    await prog_msg.edit(embed=embed)
-                except discord.NotFound:
-                    # 메시지가 삭제된 경우 추적에서 제외
-                    self.last_progress_msg.pop(guild_id, None)
-                except Exception as e:
-                    logger.error(f"Message edit error: {e}")
-                    pass
+                # 이전 편집이 아직 진행 중이거나 429 대기 중인 서버는 이번 틱을 건너뜀
+                if player.edit_task or player.edit_backoff > now:
+                    continue
+
+                rendered = self.render_progress(song, elapsed, player.subtitles)
+                # 일시정지 등으로 화면이 바뀌지 않았으면 편집하지 않음
+                if player.last_rendered == rendered:
+                    continue
+                pending[guild_id] = rendered
+
+            # 틱당 편집 예산을 넘으면 가장 오래 갱신되지 않은 서버부터 처리하고 나머지는 다음 틱으로 미룸
+            budget = max(1, int(EDIT_RATE_PER_SECOND * self.update_controller.seconds)) - in_flight
+            targets = list(pending)
+            if len(targets) > budget:
+                targets.sort(key=lambda gid: self.players[gid].last_edit_at)
+                targets = targets[:max(0, budget)]
+                logger.debug(f"Progress edit budget exceeded: {len(pending)} pending, {len(targets)} sent")
+
+            for guild_id in targets:
+                player = self.players[guild_id]
+                player.edit_task = asyncio.create_task(self.edit_progress(player, player.progress_msg, pending[guild_id]))
         except Exception as e:
             logger.error(f"update_controller total error: {e}")
+        finally:
+            self.metrics.controller_tick_seconds.observe(time.monotonic() - now)
+
+    async def edit_progress(self, player, prog_msg, rendered):
+        bar, time_str, current_sub = rendered
+        embed = prog_msg.embeds[0].copy()
+        
+        # Update progress field (it should be the first field)
+        embed.set_field_at(0, name="재생 진행도", value=f"`{bar}`\n⏳ {time_str}", inline=False)
+        
+        if current_sub:
+            embed.description = f"💬 **자막:**\n{current_sub}"
+        else:
+            embed.description = ""
+            
+        try:
+            async with self.edit_semaphore:
+                started = time.perf_counter()
+                await prog_msg.edit(embed=embed)
+                self.metrics.edit_seconds.observe(time.perf_counter() - started)
+            if player.progress_msg is prog_msg:
+                player.last_rendered = rendered
+        except discord.NotFound:
+            # 메시지가 삭제된 경우 추적에서 제외
+            if player.progress_msg is prog_msg:
+                player.progress_msg = None
+        except discord.RateLimited as e:
+            self.metrics.rate_limited.inc('progress_edit')
+            player.edit_backoff = time.monotonic() + e.retry_after
+            logger.warning(f"Progress edit rate limited for guild {player.guild_id}: retry after {e.retry_after:.1f}s")
+        except discord.HTTPException as e:
+            if e.status == 429:
+                # 재시도마다 받은 429는 on_rate_limit에서 이미 집계됨
+                player.edit_backoff = time.monotonic() + RATE_LIMIT_BACKOFF
+                logger.warning(f"Progress edit rate limited for guild {player.guild_id}")
+            else:
+                logger.error(f"Message edit error: {e}")
+        except Exception as e:
+            logger.error(f"Message edit error: {e}")
+        finally:
+            player.last_edit_at = time.monotonic()
+            player.edit_task = None
                 
-    async def fetch_and_parse_vtt(self, video_id):
+    def next_change_point(self, song, elapsed, subs):
+        """진행바 칸이 넘어가거나 다음 자막이 표시되는 가장 가까운 재생 시점을 계산합니다."""
+        points = [elapsed + TIMELINE_MAX_SLEEP]
+        duration = song.duration
+        if duration and int(duration) > 0:
+            duration_int = int(duration)
+            cell = int((elapsed / duration_int) * 15)
+            if cell < 15:
+                points.append((cell + 1) * duration_int / 15)
+        if subs:
+            index = subs.index_at(elapsed)
+            if index + 1 < len(subs):
+                points.append(subs.starts[index + 1] - SUBTITLE_LEAD)
+        return min(points)
+
+    async def run_timeline(self, player):
+        """정해진 주기 대신 화면이 실제로 바뀌는 시점에만 깨어나 진행바를 편집합니다."""
+        while True:
+            prog_msg = player.progress_msg
+            song = player.current
+            if not prog_msg or not song or not player.is_playing:
+                return
+
+            backoff = player.edit_backoff - time.monotonic()
+            if backoff > 0:
+                await asyncio.sleep(backoff)
+                continue
+
+            elapsed = player.elapsed()
+            subs = player.subtitles
+            rendered = self.render_progress(song, elapsed, subs)
+            if prog_msg.embeds and player.last_rendered != rendered:
+                await self.edit_progress(player, prog_msg, rendered)
+
+            # 일시정지 중에는 화면이 바뀌지 않으므로 재개 시 다시 예약됨
+            if player.pause_time:
+                return
+
+            # 부동소수점 오차로 경계 직전에 깨어나지 않도록 약간의 여유를 둠
+            wait = self.next_change_point(song, elapsed, subs) - player.elapsed() + 0.05
+            await asyncio.sleep(max(wait, TIMELINE_MIN_GAP))
+
+    def reschedule_timeline(self, player):
+        """곡 변경, 일시정지/재개, 자막 로딩 완료 시 타임라인을 다시 계산합니다."""
+        player.cancel_timeline()
+        if player.timeline:
+            player.timeline_task = asyncio.create_task(self.run_timeline(player))
+
+    async def fetch_and_parse_vtt(self, video_id, caption_url=None, caption_auto=False):
+        cached = self.transcript_cache.get(video_id)
+        if cached is not None:
+            return cached
+
         def _fetch():
+            """(자막, 캐시 가능 여부)를 반환합니다. 일시적인 오류는 캐시하지 않습니다."""
             try:
-                from youtube_transcript_api import YouTubeTranscriptApi
-                yt_api = YouTubeTranscriptApi()
-                t_list = yt_api.list(video_id)
+                api = self.load_transcript_api()
+                from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled
                 try:
+                    t_list = api.list(video_id)
                     t = t_list.find_transcript(['ko', 'en', 'ja'])
-                except:
-                    return []
-                snippets = t.fetch()
-                subs = []
-                for s in snippets:
-                    # HTML 엔티티/기본 태그 제거
-                    text = re.sub(r'<[^>]+>', '', s.text)
-                    text = text.replace('&nbsp;', ' ').strip()
-                    if text:
-                        subs.append({
-                            'start': s.start,
-                            'end': s.start + s.duration,
-                            'text': text
-                        })
-                return subs
+                except (NoTranscriptFound, TranscriptsDisabled):
+                    return SubtitleTrack(), True
+                subs = SubtitleTrack.from_cues(cues_from_snippets(t.fetch()))
+                logger.info(f"Loaded {len(subs)} subtitle cues for {video_id} ({subs.nbytes()} bytes)")
+                return subs, True
             except Exception as e:
                 logger.error(f"Transcript API error: {e}")
-                return []
+                return SubtitleTrack(), False
                 
-        return await asyncio.to_thread(_fetch)
+        started = time.perf_counter()
+        try:
+            subs, cacheable = await self.transcript_executor.run(_fetch)
+        except ExecutorSaturated:
+            subs, cacheable = SubtitleTrack(), False
+        if not len(subs) and caption_url:
+            # 자막 API가 막혔거나 자막을 못 찾았으면 yt-dlp가 알려준 자막 파일을 직접 받아 파싱
+            fallback = await self.fetch_caption_file(video_id, caption_url, merge=bool(caption_auto))
+            if fallback is not None:
+                subs, cacheable = fallback, True
+        self.metrics.transcript_fetch_seconds.observe(time.perf_counter() - started)
+        if cacheable:
+            self.transcript_cache.put(video_id, subs)
+        return subs
 
-    async def check_queue(self, ctx):
-        guild_id = ctx.guild.id
-        if guild_id in self.queue and len(self.queue[guild_id]) > 0:
-            song = self.queue[guild_id].pop(0)
-            await self.play_music(ctx, song)
+    async def fetch_caption_file(self, video_id, caption_url, merge=False):
+        """VTT/SRT 자막 파일을 받으면서 바로 파싱합니다. 실패하면 None.
+
+        merge는 자동 생성 자막에만 씁니다. 직접 등록된 자막(가사 등)은 반복되는 줄도 그대로 보여야 하므로 합치지 않습니다.
+        """
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=SUBTITLE_TIMEOUT)) as session:
+                async with session.get(caption_url) as resp:
+                    resp.raise_for_status()
+                    subs = await parse_caption_stream(resp.content, merge=merge)
+            logger.info(f"Loaded {len(subs)} subtitle cues for {video_id} from caption file")
+            return subs
+        except Exception as e:
+            logger.error(f"Caption file error ({video_id}): {e}")
+            return None
+
+    async def load_subtitles(self, player, song):
+        """자막을 백그라운드에서 불러와 해당 곡이 아직 재생 중일 때만 반영합니다."""
+        try:
+            # 시간 초과되어도 받아온 자막은 캐시에 저장되도록 작업 자체는 계속 진행
+            subs = await asyncio.wait_for(asyncio.shield(self.fetch_and_parse_vtt(song.id, song.caption_url, song.caption_auto)), timeout=SUBTITLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Subtitle fetch timed out after {SUBTITLE_TIMEOUT}s: {song.id}")
+            return
+        # update_controller가 다음 틱에서 자동으로 반영함
+        if player.current is song:
+            player.subtitles = subs
+            self.reschedule_timeline(player)
+
+    async def resolve_stream(self, song):
+        """스트림 주소가 없거나 만료되었으면 캐시 또는 webpage_url 재추출로 갱신합니다."""
+        if is_stream_fresh(song):
+            return song
+
+        cached = self.track_cache.get(song.id)
+        if cached and cached.url:
+            song.update_from(cached)
+            # 코덱/자막 주소는 스트림 주소와 짝이므로 값이 없어도 함께 교체
+            song.acodec = cached.acodec
+            song.caption_url = cached.caption_url
+            song.caption_auto = cached.caption_auto
+            return song
+
+        if not song.webpage_url:
+            return song
+
+        # 재생 중인 곡의 다음 곡이 끊기지 않도록 스트림 주소 해석은 대기열이 차도 거절하지 않음
+        info = await self.extract('default', song.webpage_url, 'stream', reject=False)
+        fresh = self.parse_song_info(info)
+        song.update_from(fresh)
+        # 코덱/자막 주소는 이번 추출 결과와 짝이므로 값이 없어도 함께 교체
+        song.acodec = fresh.acodec
+        song.caption_url = fresh.caption_url
+        song.caption_auto = fresh.caption_auto
+        self.track_cache.put(song)
+        return song
+
+    async def stream_codec(self, song, cached=None):
+        """FFmpegOpusAudio에 넘길 (codec, bitrate). yt-dlp가 알려준 코덱이 있으면 ffprobe를 생략합니다."""
+        if cached:
+            # 로컬 파일의 코덱은 create_source에서 캐시 기록으로 결정
+            return None, None
+        if song.acodec == 'opus':
+            # Opus(WebM) 스트림은 재인코딩 없이 그대로 전달
+            return 'opus', None
+        if song.acodec and song.acodec != 'none':
+            # 그 외 코덱은 libopus로 트랜스코딩
+            return None, None
+        # 코덱 정보가 없는 곡(이전 캐시 항목 등)만 프로브
+        return await discord.FFmpegOpusAudio.probe(song.url)
+
+    async def prepare_song(self, song):
+        """재생 직전에 필요한 스트림 주소, 프로브 결과, 자막을 한 번에 준비합니다."""
+        # 캐시 파일은 한 번만 열어 두고 그 결과로 판단 (확인과 사용 사이에 지워져도 스트림 주소는 해석되어 있음)
+        cached = self.audio_cache.open(song)
+        if not cached:
+            await self.resolve_stream(song)
+        probe = self.stream_codec(song, cached)
+        if song.id:
+            (codec, bitrate), subtitles = await asyncio.gather(probe, self.fetch_and_parse_vtt(song.id, song.caption_url, song.caption_auto))
         else:
-            self.is_playing[guild_id] = False
-            self.current_song[guild_id] = None
+            (codec, bitrate), subtitles = await probe, SubtitleTrack()
+        prepared = {'codec': codec, 'bitrate': bitrate, 'subtitles': subtitles, 'cached': cached}
+        if PREWARM_FRAMES > 0 and self.prewarmed < PREWARM_MAX_SOURCES:
+            try:
+                prepared['source'] = await self.prewarm_source(song, codec, bitrate, cached)
+            except ExecutorSaturated:
+                pass # 미리 띄우지 못해도 재생 시 새로 만들면 됨
+        return prepared
+
+    async def prewarm_source(self, song, codec, bitrate, cached=None):
+        """다음 곡 FFmpeg를 미리 실행해 접속/버퍼링을 끝내고 첫 프레임을 받아 둡니다."""
+        self.prewarmed += 1
+        try:
+            source = self.create_source(song, codec, bitrate, cached=cached)
+            return await PrewarmedSource.create(source, PREWARM_FRAMES, on_release=self.release_prewarmed,
+                                                executor=self.audio_executor)
+        except BaseException:
+            self.prewarmed -= 1
+            raise
+
+    def create_source(self, song, codec, bitrate, start_at=0, cached=None):
+        """cached(오디오 캐시 파일 경로, 코덱)가 있으면 로컬 파일로, 없으면 스트림 주소로 FFmpeg 소스를 만듭니다."""
+        if cached:
+            path, acodec = cached
+            # 로컬 파일은 재접속 옵션이 필요 없음
+            before_options = f"-ss {start_at:.1f}" if start_at else None
+            return discord.FFmpegOpusAudio(path, codec='opus' if acodec == 'opus' else None,
+                                           before_options=before_options, options='-vn')
+
+        ffmpeg_options = dict(FFMPEG_OPTIONS)
+        if start_at:
+            # 복원 재생은 저장된 위치부터 시작
+            ffmpeg_options['before_options'] = f"-ss {start_at:.1f} {ffmpeg_options['before_options']}"
+        return discord.FFmpegOpusAudio(song.url, codec=codec, bitrate=bitrate, **ffmpeg_options)
+
+    def release_prewarmed(self):
+        self.prewarmed -= 1
 
-    async def play_music(self, ctx, song):
+    def schedule_prefetch(self, player):
+        if not player.queue:
+            return
+        head = player.queue[0]
+        if player.prefetch and player.prefetch[0] is head:
+            return
+        player.cancel_prefetch()
+        player.prefetch = (head, asyncio.create_task(self.prepare_song(head)))
+        logger.info(f"Prefetching next song for guild {player.guild_id}: {head.title}")
+
+    async def take_prefetched(self, player, song):
+        """대기열에서 꺼낸 곡에 대해 준비가 끝난(또는 진행 중인) 사전 준비 결과를 가져옵니다."""
+        pending, player.prefetch = player.prefetch, None
+        if not pending:
+            return None
+        prefetched_song, task = pending
+        if prefetched_song is not song:
+            player.prefetch = pending
+            player.cancel_prefetch()
+            return None
+        try:
+            return await task
+        except asyncio.CancelledError:
+            return None
+        except Exception as e:
+            logger.error(f"Prefetch error: {e}")
+            return None
+
+    async def check_queue(self, ctx, player=None, skipped=None):
+        """대기열의 다음 곡을 재생합니다. 불러오지 못한 곡은 재귀 없이 반복문으로 건너뛰고 한 번에 알립니다."""
+        if player is not None and self.players.get(ctx.guild.id) is not player:
+            # 유휴 회수로 내려간 플레이어의 재생 종료 콜백이면 아무것도 하지 않음
+            return
+        player = self.get_player(ctx.guild.id)
+        skipped = skipped or []
+        try:
+            while True:
+                song = player.pop_next()
+                if not song:
+                    player.is_playing = False
+                    player.current = None
+                    self.session_store.end_current(ctx.guild.id)
+                    return
+                prepared = await self.take_prefetched(player, song)
+                if await self.start_track(ctx, song, prepared=prepared):
+                    return
+                skipped.append(song.title)
+        finally:
+            if skipped:
+                names = ", ".join(f"`{title}`" for title in skipped[:5])
+                more = f" 외 {len(skipped) - 5}곡" if len(skipped) > 5 else ""
+                await ctx.send(f"⚠️ 불러오지 못해 건너뛴 곡: {names}{more}", delete_after=10)
+
+    async def play_music(self, ctx, song, prepared=None, start_at=0):
+        """곡을 재생합니다. 불러오지 못하면 대기열의 다음 곡으로 넘어갑니다."""
+        if not await self.start_track(ctx, song, prepared=prepared, start_at=start_at):
+            await self.check_queue(ctx, skipped=[song.title])
+
+    async def start_track(self, ctx, song, prepared=None, start_at=0):
+        """곡 재생을 시작합니다. 스트림 주소를 해석하지 못해 건너뛰어야 하면 False를 반환합니다."""
         guild_id = ctx.guild.id
-        self.is_playing[guild_id] = True
+        player = self.get_player(guild_id)
+        request_time = time.perf_counter()
+        player.is_playing = True
+
+        if prepared and prepared['cached'] and not prepared.get('source') and not os.path.exists(prepared['cached'][0]):
+            # 준비해 둔 캐시 파일이 그 사이 정리되었으면 처음부터 다시 준비
+            prepared = None
+        cached = prepared['cached'] if prepared else self.audio_cache.open(song)
+        if not prepared and not cached:
+            # 대기열/이력에 오래 머문 곡이나 재생목록 항목은 재생 직전에 스트림 주소를 해석
+            try:
+                await self.resolve_stream(song)
+            except Exception as e:
+                logger.error(f"Stream resolve error ({song.webpage_url}): {e}")
+                return False
         
         # 현재 곡을 이력에 추가 (이전 곡이 있었다면)
-        if self.current_song.get(guild_id):
-            if guild_id not in self.history:
-                self.history[guild_id] = []
-            self.history[guild_id].append(self.current_song[guild_id])
-            if len(self.history[guild_id]) > 20: # 이력은 최근 20곡까지만
-                self.history[guild_id].pop(0)
-
-        self.current_song[guild_id] = song
-        self.start_times[guild_id] = time.time()
-        self.pause_times[guild_id] = 0
-        self.pause_durations[guild_id] = 0
-        self.subtitles[guild_id] = []
+        player.start(song)
+
+        if player.subtitle_task:
+            player.subtitle_task.cancel()
+            player.subtitle_task = None
         
-        if song.get('id'):
-            self.subtitles[guild_id] = await self.fetch_and_parse_vtt(song['id'])
+        if prepared:
+            player.subtitles = prepared['subtitles']
+        elif song.id:
+            # 자막은 음성 연결/프로브와 병렬로 불러오고, 준비되는 대로 반영
+            player.subtitle_task = asyncio.create_task(self.load_subtitles(player, song))
+
+        probe_task = None
+        if not prepared:
+            probe_task = asyncio.create_task(self.stream_codec(song, cached))
         
         vc = ctx.voice_client
         if not vc:
@@ -388,54 +981,120 @@ class Music(commands.Cog):
                 await ctx.author.voice.channel.connect()
                 vc = ctx.voice_client
             else:
-                return await ctx.send("❌ 먼저 음성 채널에 접속해 주세요!")
+                if probe_task:
+                    probe_task.cancel()
+                if prepared and prepared.get('source'):
+                    prepared['source'].cleanup()
+                if player.subtitle_task:
+                    player.subtitle_task.cancel()
+                    player.subtitle_task = None
+                # 재생 중 상태를 되돌리고 곡은 대기열 맨 앞에 남겨, 다음 재생 요청이나 유휴 회수가 막히지 않게 함
+                player.is_playing = False
+                player.current = None
+                player.push_front(song)
+                self.session_store.end_current(guild_id)
+                await ctx.send("❌ 먼저 음성 채널에 접속해 주세요!")
+                return True
 
-        source = await discord.FFmpegOpusAudio.from_probe(song['url'], **FFMPEG_OPTIONS)
+        if prepared:
+            # 사전 준비된 코덱 정보로 바로 소스 생성
+            codec, bitrate = prepared['codec'], prepared['bitrate']
+        else:
+            codec, bitrate = await probe_task
+        if prepared and prepared.get('source'):
+            # 미리 띄워 둔 FFmpeg의 버퍼된 프레임부터 바로 재생
+            source = prepared['source']
+        else:
+            source = self.create_source(song, codec, bitrate, start_at, cached)
         
         def after_playing(error):
-            coro = self.check_queue(ctx)
+            coro = self.check_queue(ctx, player)
             asyncio.run_coroutine_threadsafe(coro, self.bot.loop)
 
         vc.play(source, after=after_playing)
+        # 실제 재생 시작 시점을 기준으로 진행도를 계산
+        player.start_time = time.time() - start_at
+        self.session_store.save_current(guild_id, song, start_at, vc.channel.id, ctx.channel.id)
+        player.saved_at = time.time()
+        player.first_audio_latency = time.perf_counter() - request_time
+        self.metrics.first_audio_seconds.observe(player.first_audio_latency)
+        logger.info(f"Time to first audio for guild {guild_id}: {player.first_audio_latency:.3f}s ({song.title})")
+        # 다음 재생부터는 로컬 파일을 쓰도록 백그라운드에서 저장 (이미 캐시된 곡은 무시)
+        self.audio_cache.schedule_store(song)
         
         await self.send_controller_message(ctx, song)
+        return True
+
+    def schedule_controller_repost(self, ctx, player):
+        """대기열 추가 후 컨트롤러를 다시 출력합니다.
+
+        바로 출력하지 않고 CONTROLLER_REPOST_DELAY 동안 기다려, 그 사이의 연속된 추가는 한 번의 재출력(삭제 2 + 전송 2)으로 묶습니다.
+        """
+        player.repost_ctx = ctx
+        if player.repost_task:
+            return
+
+        async def _repost():
+            await asyncio.sleep(CONTROLLER_REPOST_DELAY)
+            ctx = player.repost_ctx
+            # 여기부터는 send_controller_message가 이 작업을 취소하지 않도록 먼저 비움
+            player.repost_task = None
+            player.repost_ctx = None
+            if player.current and player.is_playing and ctx:
+                try:
+                    await self.send_controller_message(ctx, player.current)
+                except Exception as e:
+                    logger.error(f"Controller repost error for guild {player.guild_id}: {e}")
+
+        player.repost_task = asyncio.create_task(_repost())
 
     async def send_controller_message(self, ctx, song):
-        guild_id = ctx.guild.id
-        
-        # 이전 컨트롤러 메시지 삭제 시도 (선택 사항: 메시지 폭주 방지)
-        if guild_id in self.last_controller_msg:
-            try:
-                await self.last_controller_msg[guild_id].delete()
-            except:
-                pass
-                
-        if guild_id in self.last_progress_msg:
-            try:
-                await self.last_progress_msg[guild_id].delete()
-            except:
-                pass
+        player = self.get_player(ctx.guild.id)
+        # 새 곡 시작 등으로 직접 출력하면 대기 중인 재출력은 필요 없음
+        player.cancel_repost()
 
-        # 플레이어 Embed 생성
-        embed = discord.Embed(
-            title="🎵 지금 재생 중",
-            description=f"[{song['title']}]({song.get('webpage_url', '')})",
-            color=discord.Color.green()
-        )
-        if song.get('thumbnail'):
-            embed.set_image(url=song['thumbnail'])
-            
-        embed.add_field(name="재생 시간", value=self.format_duration(song.get('duration', 0)), inline=True)
-        embed.add_field(name="신청자", value=ctx.author.display_name if hasattr(ctx.author, 'display_name') else "알 수 없음", inline=True)
-        
-        msg = await ctx.send(embed=embed, view=MusicPlayerView(self, ctx))
-        self.last_controller_msg[guild_id] = msg
-        
-        # 진행도 및 자막 전용 Embed 생성
-        prog_embed = discord.Embed(color=discord.Color.blue())
-        prog_embed.add_field(name="재생 진행도", value="`🔘▬▬▬▬▬▬▬▬▬▬▬▬▬▬`\n⏳ 00:00 / 00:00", inline=False)
-        prog_msg = await ctx.send(embed=prog_embed)
-        self.last_progress_msg[guild_id] = prog_msg
+        async with player.controller_lock:
+            # 이전 메시지는 추적에서 먼저 빼서, 교체 중에 진행바 갱신이 지워질 메시지를 편집하지 않도록 함
+            old_msgs = (player.controller_msg, player.progress_msg)
+            player.controller_msg = None
+            player.progress_msg = None
+            player.last_rendered = None
+            player.cancel_timeline()
+            # 이전 컨트롤러의 버튼 뷰는 timeout이 없어 멈추지 않으면 ctx/cog 참조와 함께 계속 남음
+            player.stop_controller_view()
+
+            # 이전 컨트롤러 메시지 삭제 시도 (선택 사항: 메시지 폭주 방지)
+            for old_msg in old_msgs:
+                if old_msg:
+                    try:
+                        await old_msg.delete()
+                    except:
+                        pass
+
+            # 플레이어 Embed 생성
+            embed = discord.Embed(
+                title="🎵 지금 재생 중",
+                description=f"[{song.title}]({song.webpage_url or ''})",
+                color=discord.Color.green()
+            )
+            if song.thumbnail:
+                embed.set_image(url=song.thumbnail)
+
+            embed.add_field(name="재생 시간", value=self.format_duration(song.duration or 0), inline=True)
+            embed.add_field(name="신청자", value=ctx.author.display_name if hasattr(ctx.author, 'display_name') else "알 수 없음", inline=True)
+
+            view = MusicPlayerView(self, ctx)
+            player.controller_view = view
+            msg = await ctx.send(embed=embed, view=view)
+            player.controller_msg = msg
+
+            # 진행도 및 자막 전용 Embed 생성
+            prog_embed = discord.Embed(color=discord.Color.blue())
+            prog_embed.add_field(name="재생 진행도", value="`🔘▬▬▬▬▬▬▬▬▬▬▬▬▬▬`\n⏳ 00:00 / 00:00", inline=False)
+            prog_msg = await ctx.send(embed=prog_embed)
+            player.progress_msg = prog_msg
+            player.last_rendered = None
+            self.reschedule_timeline(player)
 
     def format_duration(self, seconds):
         if not seconds: return "알 수 없음"
@@ -454,70 +1113,86 @@ class Music(commands.Cog):
         async with ctx.typing():
             # URL인지 검색어인지 확인
             if search.startswith("http"):
-                url_options = YDL_OPTIONS.copy()
-                url_options['noplaylist'] = False
-                url_options['extract_flat'] = 'in_playlist' # 빠른 추출을 위해 (재생 직전에 다시 주소 파싱) -> wait, if extract_flat is used, play_music fails because 'url' is webpage_url not the actual stream URL. 
-                # Instead limit playlist size to prevent heavy blocking
-                url_options['extract_flat'] = False 
-                url_options['playlistend'] = 50 # 최대 50곡으로 제한
-                
-                def extract():
-                    with yt_dlp.YoutubeDL(url_options) as ydl:
-                        return ydl.extract_info(search, download=False)
-                        
                 try:
-                    info = await asyncio.to_thread(extract)
+                    # 캐시에 있는 단일 영상이면 추출 없이 바로 추가 (만료된 주소는 재생 직전에 갱신)
+                    cached = self.track_cache.get(extract_video_id(search))
+                    if cached:
+                        return await self.add_to_queue_or_play(ctx, cached)
+
+                    info = await self.extract('url', search, 'url')
                     if 'entries' in info: # 플레이리스트인 경우
                         entries = [e for e in info['entries'] if e]
                         if not entries:
                             return await ctx.send("❌ 재생목록에서 곡을 찾을 수 없습니다.")
                             
-                        songs = [self.parse_song_info(e) for e in entries]
+                        songs = [self.parse_flat_entry(e) for e in entries]
                         title = info.get('title', '재생목록')
-                        
-                        guild_id = ctx.guild.id
-                        if guild_id not in self.queue:
-                            self.queue[guild_id] = []
+                        player = self.get_player(ctx.guild.id)
                             
-                        if self.is_playing.get(guild_id):
-                            self.queue[guild_id].extend(songs)
-                            if guild_id in self.current_song:
-                                await self.send_controller_message(ctx, self.current_song[guild_id])
+                        if player.is_playing:
+                            player.extend(songs)
+                            self.schedule_controller_repost(ctx, player)
                             await ctx.send(f"📂 **{title}**의 곡 **{len(songs)}개**가 대기열에 한꺼번에 추가되었습니다!", delete_after=10)
                         else:
                             first_song = songs.pop(0)
-                            self.queue[guild_id].extend(songs)
+                            player.extend(songs)
                             await ctx.send(f"📂 **{title}**의 곡 **{len(songs)+1}개**가 대기열에 한꺼번에 추가되었습니다!", delete_after=10)
                             await self.play_music(ctx, first_song)
                     else:
                         song = self.parse_song_info(info)
+                        self.track_cache.put(song)
                         await self.add_to_queue_or_play(ctx, song)
+                except ExecutorSaturated:
+                    return await ctx.send("⏳ 지금 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.")
                 except Exception as e:
                     return await ctx.send(f"❌ 오류가 발생했습니다: {e}")
             else:
                 # 최대 9개 검색 결과 추출
-                search_options = YDL_OPTIONS.copy()
-                search_options['noplaylist'] = True
-                
-                def search_extract():
-                    with yt_dlp.YoutubeDL(search_options) as ydl:
-                        return ydl.extract_info(f"ytsearch9:{search}", download=False)['entries']
-                        
                 try:
-                    entries = await asyncio.to_thread(search_extract)
-                    if not entries:
+                    cached = self.search_cache.get(search)
+                    if cached:
+                        results, stale = cached
+                        if stale:
+                            self.refresh_search(search)
+                    else:
+                        results = await self.search_songs(search)
+                    if not results:
                         return await ctx.send("🔍 검색 결과가 없습니다.")
                     
-                    results = [self.parse_song_info(e) for e in entries]
-                    
                     embed = discord.Embed(title=f"🔍 '{search}' 검색 결과", description="재생할 곡의 번호를 버튼으로 선택해 주세요.", color=discord.Color.blue())
                     for i, res in enumerate(results, 1):
-                        embed.add_field(name=f"{i}. {res['title']}", value=f"시간: {self.format_duration(res['duration'])}", inline=False)
+                        embed.add_field(name=f"{i}. {res.title}", value=f"시간: {self.format_duration(res.duration)}", inline=False)
                     
                     await ctx.send(embed=embed, view=MusicSearchView(self, ctx, results))
+                except ExecutorSaturated:
+                    return await ctx.send("⏳ 지금 검색 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.")
                 except Exception as e:
                     return await ctx.send(f"❌ 검색 중 오류가 발생했습니다: {e}")
 
+    async def search_songs(self, query):
+        """ytsearch9 검색을 수행하고 결과를 검색 캐시에 저장합니다."""
+        entries = (await self.extract('search', f"ytsearch9:{query}", 'search'))['entries']
+        results = [self.parse_flat_entry(e) for e in entries]
+        if results:
+            self.search_cache.put(query, results)
+        return results
+
+    def refresh_search(self, query):
+        """오래된 검색 결과를 먼저 보여준 뒤 백그라운드에서 새 결과로 교체합니다."""
+        key = SearchCache.normalize(query)
+        if key in self.search_refreshes:
+            return
+
+        async def _refresh():
+            try:
+                await self.search_songs(query)
+            except Exception as e:
+                logger.error(f"Search refresh error ({query}): {e}")
+            finally:
+                self.search_refreshes.pop(key, None)
+
+        self.search_refreshes[key] = asyncio.create_task(_refresh())
+
     @commands.hybrid_command(name="ㅇ", description="유튜브 검색 및 재생을 수행합니다.")
     async def play_alias_1(self, ctx, *, search: str): await self.play(ctx, search=search)
 
@@ -528,30 +1203,131 @@ class Music(commands.Cog):
     async def play_alias_3(self, ctx, *, search: str): await self.play(ctx, search=search)
 
     def parse_song_info(self, info):
-        return {
-            'id': info.get('id'),
-            'url': info['url'],
-            'title': info['title'],
-            'thumbnail': info.get('thumbnail'),
-            'duration': info.get('duration'),
-            'webpage_url': info.get('webpage_url')
-        }
+        return Track(
+            id=info.get('id'),
+            url=info['url'],
+            title=info['title'],
+            thumbnail=info.get('thumbnail'),
+            duration=info.get('duration'),
+            webpage_url=info.get('webpage_url'),
+            acodec=info.get('acodec'),
+            caption_url=info.get('caption_url'),
+            caption_auto=info.get('caption_auto')
+        )
+
+    def parse_flat_entry(self, entry):
+        """평면 추출된 재생목록/검색 항목을 스트림 주소가 비어 있는 가벼운 곡 정보로 변환합니다."""
+        webpage_url = entry.get('url')
+        if not webpage_url or not webpage_url.startswith('http'):
+            webpage_url = f"https://www.youtube.com/watch?v={entry['id']}"
+        return Track(
+            id=entry.get('id'),
+            title=entry.get('title') or entry.get('id'),
+            thumbnail=entry.get('thumbnail'),
+            duration=entry.get('duration'),
+            webpage_url=webpage_url
+        )
 
     async def add_to_queue_or_play(self, ctx, song):
-        guild_id = ctx.guild.id
-        if guild_id not in self.queue:
-            self.queue[guild_id] = []
+        player = self.get_player(ctx.guild.id)
         
-        if self.is_playing.get(guild_id):
-            self.queue[guild_id].append(song)
-            # 대기열 추가 시 메시지를 보내는 대신, 현재 재생 중인 컨트롤러를 아래로 다시 출력
-            if guild_id in self.current_song:
-                await self.send_controller_message(ctx, self.current_song[guild_id])
+        if player.is_playing:
+            player.push(song)
+            # 대기열 추가 시 메시지를 보내는 대신, 현재 재생 중인 컨트롤러를 아래로 다시 출력 (연속 추가는 한 번으로 묶음)
+            if player.current:
+                self.schedule_controller_repost(ctx, player)
                 # 알림용 임시 메시지
-                await ctx.send(f"📂 **대기열 추가:** {song['title']}", delete_after=5)
+                await ctx.send(f"📂 **대기열 추가:** {song.title}", delete_after=5)
         else:
             await self.play_music(ctx, song)
 
+    async def resolve_item(self, item):
+        """일괄 추가 항목 하나(URL 또는 검색어)를 곡 목록으로 해석합니다. 재생목록 URL은 여러 곡이 됩니다."""
+        if item.startswith("http"):
+            cached = self.track_cache.get(extract_video_id(item))
+            if cached:
+                return [cached]
+            info = await self.extract('url', item, 'url')
+            if 'entries' in info:
+                return [self.parse_flat_entry(e) for e in info['entries'] if e]
+            song = self.parse_song_info(info)
+            self.track_cache.put(song)
+            return [song]
+
+        # 검색어는 첫 번째 결과를 사용 (스트림 주소는 재생 직전에 해석)
+        cached = self.search_cache.get(item)
+        if cached:
+            results, stale = cached
+            if stale:
+                self.refresh_search(item)
+        else:
+            results = await self.search_songs(item)
+        return results[:1]
+
+    @commands.hybrid_command(name="일괄추가", aliases=["bulk", "addall"], description="여러 URL/검색어를 한 번에 대기열에 추가합니다. (줄바꿈 또는 | 로 구분)")
+    async def bulk_add(self, ctx, *, items: str):
+        if not ctx.author.voice:
+            return await ctx.send("❌ 먼저 음성 채널에 접속해 주세요!")
+
+        # 슬래시 명령어 입력칸은 줄바꿈을 넣을 수 없으므로 | 도 구분자로 허용
+        items = [item.strip() for line in items.splitlines() for item in line.split('|') if item.strip()]
+        if not items:
+            return await ctx.send("❌ 추가할 URL이나 검색어를 입력해 주세요.")
+        if len(items) > BULK_MAX_ITEMS:
+            return await ctx.send(f"❌ 한 번에 최대 {BULK_MAX_ITEMS}개까지 추가할 수 있습니다. (입력: {len(items)}개)")
+
+        semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+        async def _resolve(item):
+            async with semaphore:
+                return await self.resolve_item(item)
+
+        async with ctx.typing():
+            player = self.get_player(ctx.guild.id)
+            # 전부 동시에 해석을 시작하되, 대기열에는 입력 순서대로 넣기 위해 앞에서부터 차례로 결과를 기다림
+            pending = [asyncio.create_task(_resolve(item)) for item in items]
+            added = 0
+            appended = False
+            failures = []
+            try:
+                for item, task in zip(items, pending):
+                    try:
+                        songs = await task
+                    except ExecutorSaturated:
+                        failures.append((item, "요청이 많아 처리하지 못함"))
+                        continue
+                    except Exception as e:
+                        logger.error(f"Bulk add error ({item}): {e}")
+                        failures.append((item, "불러오지 못함"))
+                        continue
+                    if not songs:
+                        failures.append((item, "결과 없음"))
+                        continue
+
+                    added += len(songs)
+                    if player.is_playing:
+                        player.extend(songs)
+                        appended = True
+                    else:
+                        # 첫 곡이 준비되는 즉시 재생을 시작하고 나머지는 계속 해석
+                        first_song, rest = songs[0], songs[1:]
+                        player.extend(rest)
+                        await self.play_music(ctx, first_song)
+            finally:
+                for task in pending:
+                    task.cancel()
+
+        if appended:
+            self.schedule_controller_repost(ctx, player)
+
+        lines = [f"📂 **{len(items)}개** 항목에서 곡 **{added}개**를 대기열에 추가했습니다."]
+        if failures:
+            lines.append(f"⚠️ 실패 {len(failures)}개:")
+            lines.extend(f"- `{item[:80]}`: {reason}" for item, reason in failures[:10])
+            if len(failures) > 10:
+                lines.append(f"- 외 {len(failures) - 10}개")
+        await ctx.send("\n".join(lines), delete_after=None if failures else 10)
+
     @commands.hybrid_command(name="건너뛰기", aliases=["skip", "s"], description="현재 재생 중인 곡을 건너뜁니다.")
     async def skip(self, ctx):
         if ctx.voice_client and ctx.voice_client.is_playing():
@@ -563,28 +1339,30 @@ class Music(commands.Cog):
     @commands.hybrid_command(name="정지", aliases=["stop"], description="재생을 중지하고 채널에서 나갑니다.")
     async def stop(self, ctx):
         if ctx.voice_client:
-            self.queue[ctx.guild.id] = []
-            self.history[ctx.guild.id] = []
-            self.current_song[ctx.guild.id] = None
+            player = self.get_player(ctx.guild.id)
+            player.cancel_prefetch()
+            player.cancel_timeline()
+            player.clear()
             await ctx.voice_client.disconnect()
+            # 남길 대기열이 없으므로 서버 상태를 바로 메모리에서 내림
+            self.evict_player(ctx.guild.id)
             await ctx.send("👋 재생을 중지하고 채널에서 나갔습니다.")
         else:
             await ctx.send("❌ 봇이 이미 음성 채널에 있지 않습니다.")
 
     @commands.hybrid_command(name="대기열", aliases=["queue", "q"], description="현재 재생 대기열 목록을 확인합니다.")
     async def queue_list(self, ctx):
-        guild_id = ctx.guild.id
-        queue = self.queue.get(guild_id, [])
+        player = self.get_player(ctx.guild.id)
         
-        if not queue:
+        if not player.queue:
             return await ctx.send("📋 대기열이 비어 있습니다.")
             
         embed = discord.Embed(title="📋 현재 대기열", color=discord.Color.blue())
         desc = ""
-        for i, song in enumerate(queue[:10], 1):
-            desc += f"{i}. {song['title']}\n"
-        if len(queue) > 10:
-            desc += f"...외 {len(queue)-10}곡"
+        for i, song in enumerate(player.peek(10), 1):
+            desc += f"{i}. {song.title}\n"
+        if len(player.queue) > 10:
+            desc += f"...외 {len(player.queue)-10}곡"
         
         embed.description = desc
         await ctx.send(embed=embed)
@@ -600,5 +1378,80 @@ class Music(commands.Cog):
             
         await ctx.send(f"✅ 자막 및 진행바 갱신 주기를 **{seconds}초**로 변경했습니다!")
 
+    @commands.hybrid_command(name="상태", aliases=["stats", "metrics"], description="(관리자) 음악 기능의 지연 시간, 캐시, 부하 지표를 확인합니다.")
+    @commands.is_owner()
+    async def show_metrics(self, ctx):
+        def ms(value):
+            return f"{value * 1000:.0f}ms" if value is not None else "-"
+
+        m = self.metrics
+        gauges = {name: value for name, _, value in self.collect_gauges()}
+        embed = discord.Embed(title="📊 음악 봇 상태", color=discord.Color.blurple())
+        embed.add_field(name="추출 평균", value="\n".join(
+            f"{kind}: {ms(m.extract_seconds.mean(kind))}" for kind in ('search', 'url', 'playlist', 'stream')), inline=True)
+        embed.add_field(name="재생/자막", value=(
+            f"첫 소리까지: {ms(m.first_audio_seconds.mean())}\n"
+            f"자막 요청: {ms(m.transcript_fetch_seconds.mean())}\n"
+            f"자막 캐시 적중률: {gauges['musicbot_transcript_cache_hit_rate']:.0%}"), inline=True)
+        embed.add_field(name="진행바 갱신", value=(
+            f"주기: {self.update_controller.seconds:g}초\n"
+            f"틱 처리: {ms(m.controller_tick_seconds.mean())}\n"
+            f"편집 요청: {ms(m.edit_seconds.mean())}\n"
+            f"429 횟수: {m.rate_limited.total()}"), inline=True)
+        embed.add_field(name="부하", value=(
+            f"음성 연결: {gauges['musicbot_voice_clients']}\n"
+            f"대기열 곡 수: {gauges['musicbot_queued_tracks']} (최대 {gauges['musicbot_queue_length_max']})\n"
+            f"이벤트 루프 지연: {ms(m.loop_lag)}\n"
+            f"추출 대기: {gauges['musicbot_extractor_queued']}"), inline=True)
+        startup = getattr(self.bot, 'startup', None)
+        if startup and startup.phases:
+            embed.add_field(name=f"시작 소요 ({startup.total:.1f}초)", value="\n".join(
+                f"{phase}: {seconds:.2f}초" for phase, seconds in startup.phases), inline=True)
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(name="메모리", aliases=["memory", "mem"], description="(관리자) 서버별/전체 메모리 사용량과 유휴 회수 현황을 확인합니다.")
+    @commands.is_owner()
+    async def show_memory(self, ctx):
+        def mib(value):
+            return f"{value / (1024 * 1024):.2f}MiB"
+
+        sizes = sorted(((player.nbytes(), guild_id, player) for guild_id, player in self.players.items()),
+                       key=lambda item: item[0], reverse=True)
+        total = sum(size for size, _, _ in sizes)
+        embed = discord.Embed(title="🧠 메모리 사용량", color=discord.Color.blurple())
+        embed.add_field(name="전체", value=(
+            f"프로세스 RSS: {mib(process_rss())}\n"
+            f"서버 상태: {len(self.players)}개, {mib(total)}\n"
+            f"음성 연결: {len(self.bot.voice_clients)}\n"
+            f"미리 띄운 FFmpeg: {self.prewarmed}"), inline=True)
+        reclaims = self.metrics.idle_reclaims.values
+        embed.add_field(name="유휴 회수", value=(
+            f"빈 채널: {reclaims.get(('empty_channel',), 0)}\n"
+            f"재생 없음: {reclaims.get(('idle',), 0)}\n"
+            f"상태만 내림: {reclaims.get(('evict',), 0)}"), inline=True)
+        if sizes:
+            lines = []
+            for size, guild_id, player in sizes[:10]:
+                guild = self.bot.get_guild(guild_id)
+                name = guild.name if guild else str(guild_id)
+                state = "🔊" if guild and guild.voice_client else "💤"
+                lines.append(f"{state} {name[:24]}: {mib(size)} (대기열 {len(player.queue)}곡, 자막 {len(player.subtitles)}줄)")
+            embed.add_field(name="서버별 상위 10개", value="\n".join(lines), inline=False)
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(name="타임라인", aliases=["timeline"], description="진행바를 주기 대신 자막/진행바가 바뀌는 시점에만 갱신하는 모드를 켜거나 끕니다.")
+    async def toggle_timeline(self, ctx):
+        player = self.get_player(ctx.guild.id)
+        if player.timeline:
+            player.timeline = False
+            self.session_store.save_settings(ctx.guild.id, False)
+            player.cancel_timeline()
+            await ctx.send("⏱️ 타임라인 모드를 껐습니다. 자막 및 진행바가 `/자막주기` 주기로 갱신됩니다.")
+        else:
+            player.timeline = True
+            self.session_store.save_settings(ctx.guild.id, True)
+            self.reschedule_timeline(player)
+            await ctx.send("⏱️ 타임라인 모드를 켰습니다. 자막 및 진행바가 바뀌는 시점에 맞춰 갱신됩니다.")
+
 async def setup(bot):
     await bot.add_cog(Music(bot))
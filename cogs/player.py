@@ -0,0 +1,279 @@
+import sys
+import time
+import random
+import asyncio
+from collections import deque
+from itertools import islice
+
+from .subtitles import SubtitleTrack
+
+# 이전곡(⏮️)용 이력은 최근 20곡까지만 보관
+HISTORY_SIZE = 20
+
+
+class Track:
+    """곡 정보. 대기열에 수만 곡이 쌓여도 가볍도록 dict 대신 __slots__를 사용합니다."""
+    __slots__ = ('id', 'url', 'title', 'thumbnail', 'duration', 'webpage_url', 'acodec', 'caption_url', 'caption_auto')
+
+    def __init__(self, id=None, url=None, title=None, thumbnail=None, duration=None, webpage_url=None, acodec=None,
+                 caption_url=None, caption_auto=None):
+        self.id = id
+        self.url = url
+        self.title = title
+        self.thumbnail = thumbnail
+        self.duration = duration
+        self.webpage_url = webpage_url
+        self.acodec = acodec # url 스트림의 오디오 코덱 (yt-dlp가 알려준 값, 모르면 None)
+        self.caption_url = caption_url # 자막 API를 쓸 수 없을 때 대신 받을 VTT/SRT 주소
+        self.caption_auto = caption_auto # caption_url이 유튜브 자동 생성 자막인지 (롤링 자막 병합 여부 결정)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data.get(field) for field in cls.__slots__})
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def copy(self):
+        return Track(*(getattr(self, field) for field in self.__slots__))
+
+    def update_from(self, other):
+        """other에 값이 있는 항목만 덮어씁니다 (재생목록 항목 → 완전한 곡 정보)."""
+        for field in self.__slots__:
+            value = getattr(other, field)
+            if value:
+                setattr(self, field, value)
+
+    def nbytes(self):
+        """곡 정보가 차지하는 대략적인 메모리 크기 (바이트)."""
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(value) for value in (getattr(self, field) for field in self.__slots__) if value is not None
+        )
+
+    def __repr__(self):
+        return f"<Track id={self.id!r} title={self.title!r}>"
+
+
+class GuildPlayer:
+    """서버 하나의 재생 상태를 모아 둔 객체.
+
+    대기열은 deque라서 양 끝 추가/제거가 O(1)이고, 이력은 크기가 고정된 링 버퍼입니다.
+    중간 위치 삭제(remove)와 이동(move)은 deque와 세션 기록 모두 위치에 비례하는 O(n)이지만, 대기열 전체를 다시 쓰지는 않습니다.
+    store(SessionStore)가 주어지면 대기열/이력 변경을 함께 기록해 재시작 후 복원할 수 있습니다.
+    """
+    __slots__ = (
+        'guild_id', 'store', 'saved_at', 'queue', 'history', 'current', 'is_playing',
+        'start_time', 'pause_time', 'pause_duration', 'subtitles',
+        'controller_msg', 'controller_view', 'progress_msg', 'controller_lock', 'repost_task', 'repost_ctx',
+        'prefetch', 'subtitle_task', 'first_audio_latency',
+        'last_rendered', 'last_edit_at', 'edit_task', 'edit_backoff',
+        'timeline', 'timeline_task', 'idle_since', 'empty_since',
+    )
+
+    def __init__(self, guild_id, store=None):
+        self.guild_id = guild_id
+        self.store = store
+        self.saved_at = 0.0 # 재생 위치를 마지막으로 기록한 시각
+        self.queue = deque()
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.current = None
+        self.is_playing = False
+
+        self.start_time = 0.0
+        self.pause_time = 0.0 # 일시정지 시각 (재생 중이면 0)
+        self.pause_duration = 0.0 # 누적 일시정지 시간
+        self.subtitles = SubtitleTrack()
+
+        self.controller_msg = None # 정적 재생 정보 + MusicPlayerView 메시지
+        self.controller_view = None # controller_msg의 MusicPlayerView (timeout이 없어 stop()해야 ViewStore에서 빠짐)
+        self.progress_msg = None # 진행바 + 자막 메시지
+        self.controller_lock = asyncio.Lock() # 두 메시지 교체가 겹쳐 이전 메시지가 남지 않도록
+        self.repost_task = None # 대기열 추가 후 컨트롤러 재출력 대기 작업 (연속 추가를 한 번으로 묶음)
+        self.repost_ctx = None # 재출력 시 사용할 가장 최근 요청의 ctx
+
+        self.prefetch = None # (Track, asyncio.Task) 다음 곡 사전 준비 작업
+        self.subtitle_task = None # 현재 곡 자막 로딩 작업
+        self.first_audio_latency = None # 마지막 곡의 time-to-first-audio (초)
+
+        self.last_rendered = None # 마지막으로 전송한 (진행바, 시간, 자막)
+        self.last_edit_at = 0.0 # 마지막 편집 시각 (예산 초과 시 공정한 순서 결정용)
+        self.edit_task = None # 진행 중인 진행바 편집 작업
+        self.edit_backoff = 0.0 # 429 이후 다음 편집이 허용되는 시각
+
+        self.timeline = False # 주기 갱신 대신 타임라인 모드 사용 여부
+        self.timeline_task = None # 다음 화면 변화 시점까지 대기하는 작업
+
+        self.idle_since = 0.0 # 재생이 멈춘 채로 처음 확인된 시각 (monotonic, 0이면 재생 중)
+        self.empty_since = 0.0 # 음성 채널에 청취자가 없다고 처음 확인된 시각 (monotonic, 0이면 청취자 있음)
+
+    def load(self, queue, history):
+        """저장된 대기열/이력을 기록 없이 불러옵니다."""
+        self.queue.extend(queue)
+        self.history.extend(history)
+
+    # 대기열 조작
+    def push(self, track):
+        self.queue.append(track)
+        if self.store:
+            self.store.push(self.guild_id, track)
+
+    def push_front(self, track):
+        self.queue.appendleft(track)
+        if self.store:
+            self.store.push_front(self.guild_id, track)
+
+    def extend(self, tracks):
+        tracks = list(tracks)
+        self.queue.extend(tracks)
+        if self.store:
+            self.store.extend(self.guild_id, tracks)
+
+    def pop_next(self):
+        if not self.queue:
+            return None
+        track = self.queue.popleft()
+        if self.store:
+            self.store.remove_at(self.guild_id, 0)
+        return track
+
+    def remove(self, index):
+        track = self.queue[index]
+        del self.queue[index]
+        if self.store:
+            self.store.remove_at(self.guild_id, index)
+        return track
+
+    def move(self, src, dst):
+        """src번째 곡을 dst 위치로 옮깁니다.
+
+        deque를 회전시켜 빼고 넣으므로 리스트로 바꿔 다시 채우지 않고, 세션 기록도 두 위치 사이의 순번만 고칩니다.
+        """
+        size = len(self.queue)
+        src, dst = src % size, dst % size
+        if src == dst:
+            return
+        self.queue.rotate(-src)
+        track = self.queue.popleft()
+        self.queue.rotate(src - dst)
+        self.queue.appendleft(track)
+        self.queue.rotate(dst)
+        if self.store:
+            self.store.move(self.guild_id, src, dst)
+
+    def shuffle(self):
+        # deque 인덱스 접근은 O(n)이므로 리스트로 섞은 뒤 다시 채움
+        tracks = list(self.queue)
+        random.shuffle(tracks)
+        self.queue.clear()
+        self.queue.extend(tracks)
+        if self.store:
+            self.store.replace(self.guild_id, tracks)
+
+    def peek(self, count):
+        return list(islice(self.queue, count))
+
+    def pop_history(self):
+        track = self.history.pop()
+        if self.store:
+            self.store.pop_history(self.guild_id)
+        return track
+
+    def clear(self):
+        self.queue.clear()
+        self.history.clear()
+        self.current = None
+        if self.store:
+            self.store.clear(self.guild_id)
+
+    # 재생 시간
+    def start(self, track):
+        """새 곡 재생을 시작합니다. 이전 곡은 이력으로 옮깁니다."""
+        if self.current:
+            self.history.append(self.current)
+            if self.store:
+                self.store.push_history(self.guild_id, self.current, HISTORY_SIZE)
+        self.current = track
+        self.is_playing = True
+        self.start_time = time.time()
+        self.pause_time = 0.0
+        self.pause_duration = 0.0
+        self.subtitles = SubtitleTrack()
+
+    def pause(self):
+        self.pause_time = time.time()
+
+    def resume(self):
+        if self.pause_time:
+            self.pause_duration += time.time() - self.pause_time
+            self.pause_time = 0.0
+
+    def elapsed(self):
+        if self.pause_time:
+            return self.pause_time - self.start_time - self.pause_duration
+        return time.time() - self.start_time - self.pause_duration
+
+    # 백그라운드 작업
+    def cancel_prefetch(self):
+        pending, self.prefetch = self.prefetch, None
+        if not pending:
+            return
+        task = pending[1]
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled() and task.exception() is None:
+            # 이미 준비가 끝났다면 미리 띄워 둔 FFmpeg 프로세스를 정리
+            source = task.result().get('source')
+            if source:
+                source.cleanup()
+
+    def cancel_timeline(self):
+        task, self.timeline_task = self.timeline_task, None
+        if task:
+            task.cancel()
+
+    def cancel_repost(self):
+        task, self.repost_task = self.repost_task, None
+        self.repost_ctx = None
+        if task:
+            task.cancel()
+
+    def cancel_tasks(self):
+        self.cancel_prefetch()
+        self.cancel_timeline()
+        self.cancel_repost()
+        for task in (self.subtitle_task, self.edit_task):
+            if task:
+                task.cancel()
+        self.subtitle_task = None
+
+    def stop_controller_view(self):
+        view, self.controller_view = self.controller_view, None
+        if view:
+            view.stop()
+
+    def release(self):
+        """유휴 회수 시 백그라운드 작업, 미리 띄운 FFmpeg, 메시지/뷰/자막 참조를 모두 정리합니다."""
+        self.cancel_tasks()
+        self.stop_controller_view()
+        self.edit_task = None
+        self.controller_msg = None
+        self.progress_msg = None
+        self.last_rendered = None
+        self.subtitles = SubtitleTrack()
+
+    def nbytes(self):
+        """이 서버의 메모리 상태(대기열, 이력, 현재 곡, 자막, 미리 읽은 프레임)의 대략적인 크기 (바이트)."""
+        size = sys.getsizeof(self) + sys.getsizeof(self.queue) + sys.getsizeof(self.history)
+        size += sum(track.nbytes() for track in self.queue)
+        size += sum(track.nbytes() for track in self.history)
+        if self.current:
+            size += self.current.nbytes()
+        size += self.subtitles.nbytes()
+        if self.prefetch:
+            task = self.prefetch[1]
+            if task.done() and not task.cancelled() and task.exception() is None:
+                prepared = task.result()
+                size += prepared['subtitles'].nbytes()
+                if prepared.get('source'):
+                    size += prepared['source'].nbytes
+        return size
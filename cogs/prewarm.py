@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from collections import deque
+
+import discord
+
+logger = logging.getLogger('musicBot.prewarm')
+
+
+class PrewarmedSource(discord.AudioSource):
+    """미리 띄운 FFmpeg 소스와 이미 읽어 둔 첫 Opus 프레임들.
+
+    곡 전환 시 새 FFmpeg가 접속/버퍼링하는 동안 생기는 공백 없이 바로 첫 프레임을 보낼 수 있습니다.
+    """
+    def __init__(self, source, frames, on_release=None):
+        self.source = source
+        self.frames = deque(frames)
+        self.on_release = on_release
+        self.released = False
+
+    @classmethod
+    async def create(cls, source, frame_count, on_release=None, executor=None):
+        """source에서 frame_count개(20ms 단위)의 프레임을 미리 읽습니다. 실패하면 source를 정리합니다.
+
+        executor(BoundedExecutor)를 주면 그 실행기에서 읽고, 없으면 기본 스레드 실행기를 씁니다.
+        """
+        def _fill():
+            frames = []
+            for _ in range(frame_count):
+                frame = source.read()
+                if not frame:
+                    break
+                frames.append(frame)
+            return frames
+
+        try:
+            # FFmpeg 파이프 읽기는 블로킹이므로 이벤트 루프 밖에서 수행
+            frames = await (executor.run(_fill) if executor else asyncio.to_thread(_fill))
+        except BaseException:
+            source.cleanup()
+            raise
+        return cls(source, frames, on_release)
+
+    @property
+    def nbytes(self):
+        return sum(len(frame) for frame in self.frames)
+
+    def read(self):
+        if self.frames:
+            return self.frames.popleft()
+        return self.source.read()
+
+    def is_opus(self):
+        return True
+
+    def cleanup(self):
+        self.frames.clear()
+        self.source.cleanup()
+        if not self.released:
+            self.released = True
+            if self.on_release:
+                self.on_release()
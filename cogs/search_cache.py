@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+
+# 검색 결과 캐시 크기 (항목 수 / 대략적인 메모리 상한)
+SEARCH_CACHE_SIZE = int(os.getenv('MUSIC_SEARCH_CACHE_SIZE', '512'))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv('MUSIC_SEARCH_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+# 이 시간이 지나면 오래된 결과로 취급 (초)
+SEARCH_CACHE_TTL = int(os.getenv('MUSIC_SEARCH_CACHE_TTL', '3600'))
+# 오래된 결과를 일단 보여주고 백그라운드에서 새로 검색할지 여부
+SEARCH_CACHE_REFRESH = os.getenv('MUSIC_SEARCH_CACHE_REFRESH', '1') == '1'
+# 백그라운드 갱신을 하더라도 이 시간이 지난 결과는 버림 (초)
+SEARCH_CACHE_STALE_TTL = int(os.getenv('MUSIC_SEARCH_CACHE_STALE_TTL', str(24 * 3600)))
+
+
+def _track_size(track):
+    return sys.getsizeof(track) + sum(sys.getsizeof(getattr(track, field)) for field in track.__slots__)
+
+
+class SearchCache:
+    """정규화된 검색어 → 검색 결과 목록을 보관하는 TTL 기반 LRU 캐시."""
+    def __init__(self, max_entries=SEARCH_CACHE_SIZE, max_bytes=SEARCH_CACHE_MAX_BYTES,
+                 ttl=SEARCH_CACHE_TTL, refresh=SEARCH_CACHE_REFRESH, stale_ttl=SEARCH_CACHE_STALE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.refresh = refresh
+        self.stale_ttl = stale_ttl if refresh else ttl
+        self.entries = OrderedDict() # query: (저장 시각, 결과 목록, 크기)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(query):
+        return ' '.join(query.lower().split())
+
+    def get(self, query):
+        """(결과 목록, 갱신 필요 여부)를 반환합니다. 캐시에 없으면 None."""
+        key = self.normalize(query)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        age = time.time() - entry[0]
+        if age > self.stale_ttl:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        # 재생 중 곡 정보가 갱신되어도 캐시 원본은 바뀌지 않도록 복사본을 전달
+        return [track.copy() for track in entry[1]], age > self.ttl
+
+    def put(self, query, results):
+        key = self.normalize(query)
+        if key in self.entries:
+            self._remove(key)
+        size = sum(_track_size(track) for track in results)
+        self.entries[key] = (time.time(), [track.copy() for track in results], size)
+        self.nbytes += size
+        while self.entries and (len(self.entries) > self.max_entries or self.nbytes > self.max_bytes):
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.nbytes -= entry[2]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.nbytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
@@ -0,0 +1,196 @@
+import os
+import json
+import sqlite3
+import time
+import logging
+
+from .player import Track
+from .track_cache import CACHE_DIR, connect
+
+logger = logging.getLogger('musicBot.session_store')
+
+QUEUE = 'queue'
+HISTORY = 'history'
+
+
+class SessionStore:
+    """서버별 대기열/이력/재생 중인 곡을 재시작 후에도 복원할 수 있도록 SQLite에 기록합니다.
+
+    대기열 변경은 바뀐 항목만 행 단위로 추가/삭제하므로 곡이 많아도 변경마다 전체를 다시 쓰지 않습니다.
+    (셔플처럼 순서 전체가 바뀌는 경우만 해당 서버의 대기열을 다시 쓰고, 이동은 두 위치 사이 행의 순번만 고칩니다.)
+    """
+    def __init__(self, path=None):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.path = path or os.path.join(CACHE_DIR, 'sessions.sqlite3')
+        # 비정상 종료 시에도 마지막 커밋까지는 보존되도록 WAL 사용
+        self.conn = connect(self.path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tracks ("
+            "guild_id INTEGER NOT NULL, kind TEXT NOT NULL, seq INTEGER NOT NULL, data TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tracks_order ON tracks (guild_id, kind, seq)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "guild_id INTEGER PRIMARY KEY, voice_channel_id INTEGER, text_channel_id INTEGER, "
+            "current TEXT, position REAL NOT NULL DEFAULT 0, updated_at REAL NOT NULL)"
+        )
+        # 서버별 설정 (대기열을 비우거나 유휴 회수로 플레이어를 내려도 유지)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS settings (guild_id INTEGER PRIMARY KEY, timeline INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.conn.commit()
+
+    def _write(self, sql, params=()):
+        try:
+            self.conn.execute(sql, params)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Session store write error: {e}")
+
+    # 대기열/이력 기록
+    def push(self, guild_id, track, kind=QUEUE):
+        self._write(
+            "INSERT INTO tracks (guild_id, kind, seq, data) "
+            "SELECT ?, ?, COALESCE(MAX(seq), 0) + 1, ? FROM tracks WHERE guild_id = ? AND kind = ?",
+            (guild_id, kind, json.dumps(track.to_dict()), guild_id, kind)
+        )
+
+    def push_front(self, guild_id, track, kind=QUEUE):
+        self._write(
+            "INSERT INTO tracks (guild_id, kind, seq, data) "
+            "SELECT ?, ?, COALESCE(MIN(seq), 1) - 1, ? FROM tracks WHERE guild_id = ? AND kind = ?",
+            (guild_id, kind, json.dumps(track.to_dict()), guild_id, kind)
+        )
+
+    def extend(self, guild_id, tracks, kind=QUEUE):
+        try:
+            last = self.conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM tracks WHERE guild_id = ? AND kind = ?", (guild_id, kind)
+            ).fetchone()[0]
+            self.conn.executemany(
+                "INSERT INTO tracks (guild_id, kind, seq, data) VALUES (?, ?, ?, ?)",
+                ((guild_id, kind, last + i, json.dumps(t.to_dict())) for i, t in enumerate(tracks, 1))
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Session store write error: {e}")
+
+    def remove_at(self, guild_id, index, kind=QUEUE):
+        """index번째 항목을 지웁니다. 맨 앞은 0, 맨 뒤는 -1.
+
+        OFFSET으로 위치를 찾으므로 index에 비례해 느려집니다 (양 끝 삭제는 인덱스만 읽음).
+        """
+        order = "DESC" if index < 0 else "ASC"
+        offset = -index - 1 if index < 0 else index
+        self._write(
+            "DELETE FROM tracks WHERE rowid = (SELECT rowid FROM tracks WHERE guild_id = ? AND kind = ? "
+            f"ORDER BY seq {order} LIMIT 1 OFFSET ?)",
+            (guild_id, kind, offset)
+        )
+
+    def move(self, guild_id, src, dst, kind=QUEUE):
+        """src번째 항목을 dst 위치로 옮깁니다 (둘 다 0부터, 음수 불가).
+
+        두 위치 사이의 행만 읽어 기존 순번을 한 칸씩 밀어 다시 배정하므로 대기열 전체를 다시 쓰지 않습니다.
+        """
+        if src == dst:
+            return
+        try:
+            rows = self.conn.execute(
+                "SELECT rowid, seq FROM tracks WHERE guild_id = ? AND kind = ? ORDER BY seq LIMIT ? OFFSET ?",
+                (guild_id, kind, abs(dst - src) + 1, min(src, dst))
+            ).fetchall()
+            rowids = [row[0] for row in rows]
+            rowids = rowids[1:] + rowids[:1] if src < dst else rowids[-1:] + rowids[:-1]
+            self.conn.executemany(
+                "UPDATE tracks SET seq = ? WHERE rowid = ?", ((row[1], rowid) for row, rowid in zip(rows, rowids))
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Session store write error: {e}")
+
+    def trim(self, guild_id, limit, kind=HISTORY):
+        """가장 최근 limit개만 남기고 오래된 항목을 지웁니다."""
+        self._write(
+            "DELETE FROM tracks WHERE guild_id = ? AND kind = ? AND seq <= "
+            "(SELECT seq FROM tracks WHERE guild_id = ? AND kind = ? ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+            (guild_id, kind, guild_id, kind, limit)
+        )
+
+    def push_history(self, guild_id, track, limit):
+        self.push(guild_id, track, HISTORY)
+        self.trim(guild_id, limit, HISTORY)
+
+    def pop_history(self, guild_id):
+        self.remove_at(guild_id, -1, HISTORY)
+
+    def replace(self, guild_id, tracks, kind=QUEUE):
+        try:
+            self.conn.execute("DELETE FROM tracks WHERE guild_id = ? AND kind = ?", (guild_id, kind))
+            self.conn.executemany(
+                "INSERT INTO tracks (guild_id, kind, seq, data) VALUES (?, ?, ?, ?)",
+                ((guild_id, kind, i, json.dumps(t.to_dict())) for i, t in enumerate(tracks, 1))
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Session store write error: {e}")
+
+    def clear(self, guild_id):
+        try:
+            self.conn.execute("DELETE FROM tracks WHERE guild_id = ?", (guild_id,))
+            self.conn.execute("DELETE FROM sessions WHERE guild_id = ?", (guild_id,))
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Session store write error: {e}")
+
+    # 서버별 설정
+    def save_settings(self, guild_id, timeline):
+        self._write(
+            "INSERT OR REPLACE INTO settings (guild_id, timeline) VALUES (?, ?)", (guild_id, int(timeline))
+        )
+
+    def load_settings(self, guild_id):
+        row = self.conn.execute("SELECT timeline FROM settings WHERE guild_id = ?", (guild_id,)).fetchone()
+        return {'timeline': bool(row and row[0])}
+
+    def forget(self, guild_id):
+        """봇이 나간 서버의 대기열, 재생 기록, 설정을 모두 지웁니다."""
+        self.clear(guild_id)
+        self._write("DELETE FROM settings WHERE guild_id = ?", (guild_id,))
+
+    def load(self, guild_id):
+        """(대기열, 이력) Track 목록을 저장된 순서대로 반환합니다."""
+        rows = self.conn.execute(
+            "SELECT kind, data FROM tracks WHERE guild_id = ? ORDER BY seq", (guild_id,)
+        ).fetchall()
+        queue, history = [], []
+        for kind, data in rows:
+            (queue if kind == QUEUE else history).append(Track.from_dict(json.loads(data)))
+        return queue, history
+
+    # 재생 중인 곡
+    def save_current(self, guild_id, track, position, voice_channel_id, text_channel_id):
+        self._write(
+            "INSERT OR REPLACE INTO sessions (guild_id, voice_channel_id, text_channel_id, current, position, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (guild_id, voice_channel_id, text_channel_id, json.dumps(track.to_dict()), position, time.time())
+        )
+
+    def save_position(self, guild_id, position):
+        self._write(
+            "UPDATE sessions SET position = ?, updated_at = ? WHERE guild_id = ?",
+            (position, time.time(), guild_id)
+        )
+
+    def end_current(self, guild_id):
+        self._write("DELETE FROM sessions WHERE guild_id = ?", (guild_id,))
+
+    def active_sessions(self):
+        """재시작 직전에 재생 중이던 서버 목록: (guild_id, 음성 채널, 텍스트 채널, Track, 재생 위치)."""
+        rows = self.conn.execute(
+            "SELECT guild_id, voice_channel_id, text_channel_id, current, position FROM sessions WHERE current IS NOT NULL"
+        ).fetchall()
+        return [(gid, vcid, tcid, Track.from_dict(json.loads(cur)), pos) for gid, vcid, tcid, cur, pos in rows]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,136 @@
+import re
+
+from .subtitles import SubtitleTrack, clean_text
+
+# WebVTT(00:01.000 / 00:00:01.000)와 SRT(00:00:01,000) 시간 줄을 모두 처리
+_TIMING_RE = re.compile(
+    r'(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{1,3})\s*-->\s*(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{1,3})'
+)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def _seconds(hours, minutes, seconds, fraction):
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(fraction.ljust(3, '0')) / 1000
+
+
+class CueReader:
+    """WebVTT/SRT 문서를 한 줄씩 받아 (start, end, text) 큐를 만드는 단일 패스 리더.
+
+    문서 전체를 메모리에 올리지 않으며, 헤더/NOTE/STYLE 블록과 SRT 번호 줄은 시간 줄 밖에 있으므로 무시됩니다.
+    text는 태그를 제거한 줄들을 줄바꿈으로 이은 문자열입니다.
+    """
+    __slots__ = ('start', 'end', 'lines')
+
+    def __init__(self):
+        self.start = None
+        self.end = None
+        self.lines = []
+
+    def feed(self, line):
+        """한 줄을 처리하고, 큐 하나가 끝났으면 그 큐를 반환합니다."""
+        line = line.rstrip('\r\n').lstrip('\ufeff')
+        if '-->' in line:
+            match = _TIMING_RE.search(line)
+            if match:
+                cue = self.close()
+                groups = match.groups()
+                self.start = _seconds(*groups[:4])
+                self.end = _seconds(*groups[4:])
+                return cue
+        # 큐는 완전히 빈 줄에서 끝남 (유튜브 자동 자막은 공백 한 칸짜리 줄을 큐 본문 자리 표시로 씀)
+        if not line:
+            return self.close()
+        if self.start is not None:
+            text = _SPACE_RE.sub(' ', clean_text(line))
+            if text:
+                self.lines.append(text)
+        return None
+
+    def close(self):
+        if self.start is None:
+            return None
+        cue = (self.start, self.end, '\n'.join(self.lines)) if self.lines else None
+        self.start = None
+        self.lines = []
+        return cue
+
+
+class RollingMerger:
+    """유튜브 자동 생성 자막의 롤링 중복을 합칩니다.
+
+    자동 자막은 앞 큐의 마지막 줄을 다음 큐 첫 줄로 반복하고, 줄이 완성될 때마다 같은 내용의 10ms 큐를 끼워 넣습니다.
+    앞 큐와 겹치는 줄은 지우고, 새 줄이 없는 큐는 직전 큐의 표시 시간만 늘립니다.
+    """
+    __slots__ = ('previous', 'pending')
+
+    def __init__(self):
+        self.previous = []
+        self.pending = None
+
+    def feed(self, cue):
+        """큐 하나를 받아, 확정된 이전 큐가 있으면 반환합니다."""
+        start, end, text = cue
+        lines = text.split('\n')
+        overlap = 0
+        for size in range(min(len(self.previous), len(lines)), 0, -1):
+            if self.previous[-size:] == lines[:size]:
+                overlap = size
+                break
+        self.previous = lines
+
+        new_lines = lines[overlap:]
+        if not new_lines:
+            if self.pending:
+                self.pending[1] = max(self.pending[1], end)
+            return None
+
+        done, self.pending = self.pending, [start, end, '\n'.join(new_lines)]
+        return tuple(done) if done else None
+
+    def close(self):
+        done, self.pending = self.pending, None
+        return tuple(done) if done else None
+
+
+class CaptionParser:
+    """CueReader와 RollingMerger를 이어 붙여 줄 단위로 먹이면 최종 큐 목록을 모읍니다."""
+    __slots__ = ('reader', 'merger', 'cues')
+
+    def __init__(self, merge=True):
+        self.reader = CueReader()
+        self.merger = RollingMerger() if merge else None
+        self.cues = []
+
+    def _emit(self, cue):
+        if cue and self.merger:
+            cue = self.merger.feed(cue)
+        if cue:
+            self.cues.append(cue)
+
+    def feed(self, line):
+        self._emit(self.reader.feed(line))
+
+    def close(self):
+        """남은 큐를 마저 내보내고 전체 큐 목록을 반환합니다."""
+        self._emit(self.reader.close())
+        if self.merger:
+            cue = self.merger.close()
+            if cue:
+                self.cues.append(cue)
+        return self.cues
+
+
+def parse_captions(lines, merge=True):
+    """줄 단위 반복자(파일 객체 등)로부터 큐 목록을 만듭니다."""
+    parser = CaptionParser(merge)
+    for line in lines:
+        parser.feed(line)
+    return parser.close()
+
+
+async def parse_caption_stream(stream, merge=True):
+    """aiohttp 응답 본문 같은 바이트 줄 스트림을 받는 대로 파싱해 SubtitleTrack을 만듭니다."""
+    parser = CaptionParser(merge)
+    async for raw in stream:
+        parser.feed(raw.decode('utf-8', errors='replace'))
+    return SubtitleTrack.from_cues(parser.close())
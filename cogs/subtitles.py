@@ -0,0 +1,96 @@
+import re
+import sys
+import zlib
+import struct
+from array import array
+from bisect import bisect_right
+
+# 자막이 실제 시작 시간보다 조금 일찍 표시되도록 하는 여유 시간 (초)
+SUBTITLE_LEAD = 1.0
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def clean_text(text):
+    """HTML 엔티티/기본 태그를 제거합니다."""
+    return _TAG_RE.sub('', text).replace('&nbsp;', ' ').strip()
+
+
+def cues_from_snippets(snippets):
+    """youtube-transcript-api 스니펫(start, duration, text)을 (start, end, text) 큐 목록으로 바꿉니다."""
+    cues = []
+    for s in snippets:
+        text = clean_text(s.text)
+        if text:
+            cues.append((s.start, s.start + s.duration, text))
+    return cues
+
+
+def _little_endian(values):
+    """array를 리틀 엔디언 바이트 순서로 바꾼 복사본 (빅 엔디언 호스트에서만 변환, 같은 함수로 되돌림)."""
+    if sys.byteorder == 'little':
+        return values
+    values = array(values.typecode, values)
+    values.byteswap()
+    return values
+
+
+class SubtitleTrack:
+    """시작 시간 순으로 정렬된 자막 큐를 병렬 배열로 보관하는 구조.
+
+    큐마다 dict를 만드는 대신 시작/종료 시간은 float 배열, 본문은 문자열 리스트에 저장하고
+    재생 위치에 해당하는 자막은 이진 탐색으로 찾습니다. 탐색에 상태가 없으므로 탐색 이동이나
+    ⏮️ 이전곡 버튼으로 위치가 되돌아가도 별도 처리가 필요 없습니다.
+    """
+    __slots__ = ('starts', 'ends', 'texts')
+
+    def __init__(self, starts=None, ends=None, texts=None):
+        self.starts = starts if starts is not None else array('d')
+        self.ends = ends if ends is not None else array('d')
+        self.texts = texts if texts is not None else []
+
+    @classmethod
+    def from_cues(cls, cues):
+        """(start, end, text) 튜플 목록으로부터 트랙을 만듭니다."""
+        cues = sorted(cues, key=lambda cue: cue[0])
+        return cls(
+            array('d', (cue[0] for cue in cues)),
+            array('d', (cue[1] for cue in cues)),
+            [cue[2] for cue in cues]
+        )
+
+    def __len__(self):
+        return len(self.starts)
+
+    def index_at(self, elapsed, lead=SUBTITLE_LEAD):
+        """elapsed 시점까지 시작된 자막 중 마지막 자막의 인덱스. 없으면 -1."""
+        return bisect_right(self.starts, elapsed + lead) - 1
+
+    def text_at(self, elapsed, lead=SUBTITLE_LEAD):
+        # 시작 시간이 도달한 자막 중 가장 마지막 것을 계속 표시함(음악만 나오는 구간 등에서도 화면에 유지)
+        index = self.index_at(elapsed, lead)
+        return self.texts[index] if index >= 0 else ""
+
+    def to_bytes(self):
+        """디스크 캐시용 압축 직렬화 (개수, 시작 배열, 종료 배열, NUL 구분 본문). 숫자는 모두 리틀 엔디언."""
+        body = '\0'.join(self.texts).encode('utf-8')
+        return zlib.compress(
+            struct.pack('<I', len(self)) + _little_endian(self.starts).tobytes() + _little_endian(self.ends).tobytes() + body
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = zlib.decompress(data)
+        count = struct.unpack_from('<I', data)[0]
+        offset = 4 + count * 8
+        starts = _little_endian(array('d', data[4:offset]))
+        ends = _little_endian(array('d', data[offset:offset + count * 8]))
+        body = data[offset + count * 8:].decode('utf-8')
+        return cls(starts, ends, body.split('\0') if count else [])
+
+    def nbytes(self):
+        """트랙이 차지하는 대략적인 메모리 크기 (바이트)."""
+        return (
+            sys.getsizeof(self.starts) + sys.getsizeof(self.ends)
+            + sys.getsizeof(self.texts) + sum(sys.getsizeof(t) for t in self.texts)
+        )
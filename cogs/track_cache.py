@@ -0,0 +1,132 @@
+import os
+import re
+import sqlite3
+import time
+import logging
+
+from .player import Track
+
+logger = logging.getLogger('musicBot.track_cache')
+
+CACHE_DIR = os.getenv('MUSIC_CACHE_DIR', 'cache')
+# 여러 샤드 프로세스가 같은 캐시 파일을 쓸 때 잠금을 기다리는 최대 시간 (초)
+# 이벤트 루프에서 실행되므로 짧게 두고, 넘기면 해당 쓰기만 건너뜀
+SQLITE_TIMEOUT = float(os.getenv('MUSIC_SQLITE_TIMEOUT', '0.25'))
+# 제목/썸네일 등 정적 메타데이터 보관 기간 (기본 30일)
+METADATA_TTL = int(os.getenv('MUSIC_METADATA_TTL', str(30 * 24 * 3600)))
+# 스트림 주소 만료 직전에 재생이 끊기지 않도록 두는 여유 시간
+STREAM_EXPIRE_MARGIN = 300
+
+_EXPIRE_RE = re.compile(r'[?&/]expire[=/](\d+)')
+_VIDEO_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([\w-]{11})')
+
+
+def stream_expire(url):
+    """googlevideo 서명 주소에 포함된 expire 타임스탬프를 꺼냅니다. 없으면 None."""
+    if not url:
+        return None
+    match = _EXPIRE_RE.search(url)
+    return int(match.group(1)) if match else None
+
+
+def connect(path):
+    """캐시용 SQLite 연결. WAL 모드라 읽기는 다른 프로세스의 쓰기를 기다리지 않습니다."""
+    conn = sqlite3.connect(path, timeout=SQLITE_TIMEOUT, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def is_stream_fresh(track, margin=STREAM_EXPIRE_MARGIN):
+    """곡의 스트림 주소가 아직 재생에 쓸 수 있는지 확인합니다."""
+    if not track.url:
+        return False
+    expire = stream_expire(track.url)
+    # expire 정보가 없는 주소는 만료 시점을 알 수 없으므로 그대로 사용
+    return expire is None or expire - margin > time.time()
+
+
+def extract_video_id(url):
+    """유튜브 단일 영상 URL에서 video id를 추출합니다. 재생목록 URL은 None."""
+    if 'list=' in url:
+        return None
+    match = _VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+class TrackCache:
+    """video id 기준으로 parse_song_info 결과(Track)를 SQLite에 보관하는 캐시.
+
+    정적 메타데이터는 METADATA_TTL 동안, 스트림 주소는 주소에 포함된 expire 시점까지만 유효합니다.
+    """
+    def __init__(self, path=None):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.path = path or os.path.join(CACHE_DIR, 'tracks.sqlite3')
+        self.conn = connect(self.path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tracks ("
+            "id TEXT PRIMARY KEY, title TEXT NOT NULL, thumbnail TEXT, duration REAL, "
+            "webpage_url TEXT, url TEXT, expire INTEGER, updated_at REAL NOT NULL, acodec TEXT, "
+            "caption_url TEXT, caption_auto INTEGER)"
+        )
+        # 코덱/자막 주소 열이 없던 이전 버전의 캐시 파일에 열 추가
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tracks)")}
+        for column, kind in (('acodec', 'TEXT'), ('caption_url', 'TEXT'), ('caption_auto', 'INTEGER')):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE tracks ADD COLUMN {column} {kind}")
+        self.conn.commit()
+
+        self.hits = 0 # 메타데이터와 유효한 스트림 주소 모두 캐시에서 제공
+        self.stale_hits = 0 # 메타데이터만 유효 (스트림 주소는 재생 직전에 재추출)
+        self.misses = 0
+
+    def get(self, video_id):
+        if not video_id:
+            return None
+        row = self.conn.execute(
+            "SELECT id, title, thumbnail, duration, webpage_url, url, expire, updated_at, acodec, caption_url, caption_auto "
+            "FROM tracks WHERE id = ?",
+            (video_id,)
+        ).fetchone()
+        now = time.time()
+        if not row or now - row[7] > METADATA_TTL:
+            self.misses += 1
+            return None
+
+        url = row[5]
+        if row[6] is not None and row[6] - STREAM_EXPIRE_MARGIN <= now:
+            url = None
+        if url:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        # 코덱과 자막 주소는 같은 추출 결과에서 나온 값이라 스트림 주소와 함께 만료
+        return Track(id=row[0], url=url, title=row[1], thumbnail=row[2], duration=row[3], webpage_url=row[4],
+                     acodec=row[8] if url else None, caption_url=row[9] if url else None,
+                     caption_auto=bool(row[10]) if url else None)
+
+    def put(self, track):
+        if not track.id:
+            return
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tracks (id, title, thumbnail, duration, webpage_url, url, expire, updated_at, acodec, "
+                "caption_url, caption_auto) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (track.id, track.title, track.thumbnail, track.duration, track.webpage_url, track.url,
+                 stream_expire(track.url), time.time(), track.acodec, track.caption_url, track.caption_auto)
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Track cache write error: {e}")
+
+    def stats(self):
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.stale_hits) / total if total else 0.0
+        }
+
+    def close(self):
+        self.conn.close()
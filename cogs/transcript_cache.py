@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import time
+import logging
+
+from .subtitles import SubtitleTrack
+from .track_cache import CACHE_DIR, connect
+
+logger = logging.getLogger('musicBot.transcript_cache')
+
+# 자막 캐시 전체 크기 상한 (압축된 바이트 기준)
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv('MUSIC_TRANSCRIPT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# "자막 없음" 결과를 다시 확인하기 전까지 유지하는 시간 (기본 1일)
+TRANSCRIPT_NEGATIVE_TTL = int(os.getenv('MUSIC_TRANSCRIPT_NEGATIVE_TTL', str(24 * 3600)))
+# 조회 시각 갱신을 모아서 기록할 개수 (조회마다 커밋하지 않도록)
+ACCESS_FLUSH_SIZE = 64
+# 만료된 "자막 없음" 항목을 정리하는 간격 (초)
+PURGE_INTERVAL = 3600
+
+
+class TranscriptCache:
+    """video id별로 파싱된 자막을 압축해 SQLite에 보관하는 캐시.
+
+    자막이 없는 영상도 빈 항목으로 기록해 TRANSCRIPT_NEGATIVE_TTL 동안 다시 요청하지 않으며,
+    전체 크기가 상한을 넘으면 가장 오래 사용되지 않은 항목부터 지웁니다.
+    """
+    def __init__(self, path=None, max_bytes=TRANSCRIPT_CACHE_MAX_BYTES, negative_ttl=TRANSCRIPT_NEGATIVE_TTL):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.path = path or os.path.join(CACHE_DIR, 'transcripts.sqlite3')
+        self.max_bytes = max_bytes
+        self.negative_ttl = negative_ttl
+        self.conn = connect(self.path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            "id TEXT PRIMARY KEY, data BLOB, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS transcripts_accessed ON transcripts (accessed_at)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+        self.accessed = {} # video id: 아직 기록하지 않은 마지막 조회 시각
+        self.purged_at = 0.0
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, video_id):
+        """캐시된 SubtitleTrack을 반환합니다. 자막 없음으로 기록된 영상은 빈 트랙, 캐시에 없으면 None."""
+        row = self.conn.execute("SELECT data, created_at FROM transcripts WHERE id = ?", (video_id,)).fetchone()
+        if not row:
+            self.misses += 1
+            return None
+
+        data, created_at = row
+        if data is None:
+            if time.time() - created_at > self.negative_ttl:
+                self.misses += 1
+                return None
+            self.negative_hits += 1
+            return SubtitleTrack()
+
+        try:
+            track = SubtitleTrack.from_bytes(data)
+        except Exception as e:
+            logger.error(f"Transcript cache decode error ({video_id}): {e}")
+            self.misses += 1
+            return None
+        # LRU 순서용 조회 시각은 모아 두었다가 한 번에 기록
+        self.accessed[video_id] = time.time()
+        if len(self.accessed) >= ACCESS_FLUSH_SIZE:
+            try:
+                self._flush_accessed()
+                self.conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Transcript cache write error: {e}")
+        self.hits += 1
+        return track
+
+    def _flush_accessed(self):
+        if self.accessed:
+            self.conn.executemany(
+                "UPDATE transcripts SET accessed_at = ? WHERE id = ?",
+                [(accessed_at, video_id) for video_id, accessed_at in self.accessed.items()]
+            )
+            self.accessed.clear()
+
+    def _purge_expired(self, now):
+        """만료된 "자막 없음" 항목을 지웁니다. 크기가 0이라 용량 기준 정리로는 지워지지 않습니다."""
+        if now - self.purged_at < PURGE_INTERVAL:
+            return
+        self.purged_at = now
+        self.conn.execute(
+            "DELETE FROM transcripts WHERE data IS NULL AND created_at < ?", (now - self.negative_ttl,)
+        )
+
+    def put(self, video_id, track):
+        """자막을 저장합니다. 빈 트랙은 "자막 없음"으로 기록됩니다."""
+        data = track.to_bytes() if len(track) else None
+        size = len(data) if data else 0
+        now = time.time()
+        try:
+            old = self.conn.execute("SELECT size FROM transcripts WHERE id = ?", (video_id,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO transcripts (id, data, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (video_id, data, size, now, now)
+            )
+            self.total_bytes += size - (old[0] if old else 0)
+            self._flush_accessed()
+            self._purge_expired(now)
+            self._evict()
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Transcript cache write error: {e}")
+
+    def _evict(self):
+        # 다른 샤드 프로세스도 같은 파일에 쓰므로 이 프로세스의 누적값 대신 실제 합계로 판단
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT id, size FROM transcripts WHERE size > 0 ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for video_id, size in rows:
+                self.conn.execute("DELETE FROM transcripts WHERE id = ?", (video_id,))
+                self.total_bytes -= size
+                if self.total_bytes <= self.max_bytes:
+                    break
+
+    def stats(self):
+        total = self.hits + self.negative_hits + self.misses
+        return {
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.negative_hits) / total if total else 0.0
+        }
+
+    def close(self):
+        try:
+            self._flush_accessed()
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Transcript cache write error: {e}")
+        self.conn.close()
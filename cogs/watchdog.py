@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+
+logger = logging.getLogger('musicBot.watchdog')
+
+# 이 시간(초) 이상 이벤트 루프가 멈추면 원인 스택을 기록
+LOOP_LAG_THRESHOLD = float(os.getenv('MUSIC_LOOP_LAG_THRESHOLD', '0.5'))
+# 이벤트 루프 지연 측정 간격 (초)
+LOOP_LAG_INTERVAL = 0.5
+# 기록할 스택 프레임 수
+STACK_LIMIT = 12
+
+
+class LoopWatchdog:
+    """이벤트 루프 지연을 측정하고, 루프를 막고 있는 코드의 스택을 기록합니다.
+
+    루프 안의 하트비트 코루틴이 지연을 재고, 별도 감시 스레드는 하트비트가 threshold 이상 끊기면
+    루프 스레드의 현재 스택과 실행 중인 작업을 그 자리에서 잡아 로그로 남깁니다.
+    (블로킹 호출이 끝난 뒤에는 스택이 사라지므로 멈춘 동안 다른 스레드에서 잡아야 합니다.)
+    """
+    def __init__(self, threshold=LOOP_LAG_THRESHOLD, interval=LOOP_LAG_INTERVAL, on_sample=None):
+        self.threshold = threshold
+        self.interval = interval
+        self.on_sample = on_sample # 지연 측정값(초)을 받는 콜백 (지표 기록용)
+        self.lag = 0.0
+        self.stalls = 0
+        self.beat = time.monotonic()
+        self.loop = None
+        self.loop_thread_id = None
+        self.task = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.beat = time.monotonic()
+        self.task = asyncio.create_task(self.heartbeat())
+        self.thread = threading.Thread(target=self.watch, name='music-loop-watchdog', daemon=True)
+        self.thread.start()
+
+    async def heartbeat(self):
+        while True:
+            started = self.loop.time()
+            await asyncio.sleep(self.interval)
+            self.beat = time.monotonic()
+            self.lag = max(0.0, self.loop.time() - started - self.interval)
+            if self.on_sample:
+                self.on_sample(self.lag)
+            if self.lag >= self.threshold:
+                logger.warning(f"Event loop lag {self.lag:.3f}s")
+
+    def watch(self):
+        reported_beat = None
+        while not self.stopped.wait(self.threshold / 2):
+            beat = self.beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            # 같은 멈춤은 한 번만 기록
+            reported_beat = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame else '(no frame)\n'
+            try:
+                task = asyncio.current_task(self.loop)
+            except RuntimeError:
+                task = None
+            coro = task.get_coro() if task else None
+            logger.warning(
+                f"Event loop blocked for {stalled:.3f}s+ in {getattr(coro, '__qualname__', coro)!s}\n{stack.rstrip()}"
+            )
+
+    def stop(self):
+        self.stopped.set()
+        if self.task:
+            self.task.cancel()
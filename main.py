@@ -1,60 +1,265 @@
+import time
+STARTED_AT = time.perf_counter() # 시작 단계별 소요 시간 측정 기준 (무거운 임포트 전에 기록)
+
 import discord
 import os
+import sys
+import json
+import hashlib
 import asyncio
 import logging
 import logging.handlers
+import multiprocessing
+from multiprocessing.connection import wait
 from discord.ext import commands
 from dotenv import load_dotenv
 
-# 로그 디렉토리 자동 생성
-os.makedirs('logs', exist_ok=True)
+# 환경 변수 로드
+load_dotenv()
+TOKEN = os.getenv('MUSIC_BOT_TOKEN') # 기존 봇과 다른 토큰 사용
+
+# 샤딩 설정
+# MUSIC_SHARD_COUNT: 전체 샤드 수 ('auto'면 Discord 권장값, 비우면 샤딩 없이 실행)
+# MUSIC_SHARD_IDS: 이 프로세스가 맡을 샤드 ("0-3" 또는 "0,2,4", 비우면 전체)
+# MUSIC_SHARD_PROCESSES: 한 호스트에서 샤드를 나눠 맡을 프로세스 수
+SHARD_COUNT = os.getenv('MUSIC_SHARD_COUNT', '').strip().lower()
+SHARD_IDS = os.getenv('MUSIC_SHARD_IDS', '').strip()
+SHARD_PROCESSES = int(os.getenv('MUSIC_SHARD_PROCESSES', '1'))
+# 샤드 프로세스가 비정상 종료되었을 때 다시 띄우기 전 대기 시간 (초)
+SHARD_RESTART_DELAY = 5
+
+# 슬래시 명령어 구조가 바뀌었을 때만 동기화하기 위해 마지막으로 동기화한 구조의 해시를 저장할 파일
+COMMAND_HASH_FILE = os.path.join(os.getenv('MUSIC_CACHE_DIR', 'cache'), 'command_tree.sha256')
+# 1이면 해시와 관계없이 항상 동기화
+FORCE_SYNC = os.getenv('MUSIC_FORCE_SYNC', '0') == '1'
+# 이보다 긴 rate limit 대기는 기다리지 않고 discord.RateLimited로 올려 호출한 쪽이 건너뛰도록 함 (discord.py 최솟값 30초)
+MAX_RATELIMIT_TIMEOUT = max(30.0, float(os.getenv('MUSIC_MAX_RATELIMIT_TIMEOUT', '30')))
 
-# 로깅 설정
 logger = logging.getLogger('musicBot')
-logger.setLevel(logging.INFO)
 
-formatter = logging.Formatter('[%(asctime)s] [%(levelname)s] %(name)s: %(message)s')
 
-file_handler = logging.handlers.RotatingFileHandler(
-    filename='logs/bot.log',
-    encoding='utf-8',
-    maxBytes=5*1024*1024,
-    backupCount=5
-)
-file_handler.setFormatter(formatter)
+def parse_shard_ids(text):
+    """"0-3,6" 형식의 샤드 범위를 정수 목록으로 바꿉니다."""
+    ids = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            ids.extend(range(int(start), int(end) + 1))
+        else:
+            ids.append(int(part))
+    return sorted(set(ids))
 
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
 
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+def shard_label(shard_ids):
+    if not shard_ids:
+        return None
+    if shard_ids == list(range(shard_ids[0], shard_ids[-1] + 1)):
+        return f"{shard_ids[0]}-{shard_ids[-1]}" if len(shard_ids) > 1 else str(shard_ids[0])
+    return ','.join(map(str, shard_ids))
 
-# 환경 변수 로드
-load_dotenv()
-TOKEN = os.getenv('MUSIC_BOT_TOKEN') # 기존 봇과 다른 토큰 사용
 
-# 봇 설정
-intents = discord.Intents.default()
-intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+def setup_logging(label=None):
+    """로그 설정. 샤드 프로세스마다 별도 로그 파일을 써서 여러 프로세스가 같은 파일을 회전시키지 않도록 합니다."""
+    # 로그 디렉토리 자동 생성
+    os.makedirs('logs', exist_ok=True)
+    logger.setLevel(logging.INFO)
+    logger.handlers.clear()
+
+    prefix = f"[shard {label}] " if label else ""
+    formatter = logging.Formatter(f'[%(asctime)s] [%(levelname)s] {prefix}%(name)s: %(message)s')
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename=f'logs/bot-shard-{label}.log' if label else 'logs/bot.log',
+        encoding='utf-8',
+        maxBytes=5*1024*1024,
+        backupCount=5
+    )
+    file_handler.setFormatter(formatter)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+
+
+class StartupTimer:
+    """봇 시작 단계별 소요 시간. 재배포 후 어느 단계에서 시간이 걸리는지 확인하는 용도입니다."""
+    def __init__(self, started_at=STARTED_AT):
+        self.started_at = started_at
+        self.last = started_at
+        self.phases = [] # (단계 이름, 소요 시간)
+        self.done = False
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    @property
+    def total(self):
+        return self.last - self.started_at
+
+    def summary(self):
+        return ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in self.phases) + f" (total {self.total:.2f}s)"
+
+
+def command_tree_hash(bot):
+    """동기화될 슬래시 명령어 구조(이름, 설명, 옵션, 별칭 등)의 해시."""
+    payload = [command.to_dict(bot.tree) for command in bot.tree.get_commands()]
+    payload.sort(key=lambda command: (command.get('type', 1), command['name']))
+    key = {'application_id': bot.application_id, 'commands': payload}
+    return hashlib.sha256(json.dumps(key, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+async def sync_commands_if_changed(bot):
+    """명령어 구조가 마지막 동기화 때와 다를 때만 전역 동기화합니다. 동기화했으면 True를 반환합니다."""
+    digest = command_tree_hash(bot)
+    try:
+        with open(COMMAND_HASH_FILE, encoding='utf-8') as f:
+            synced = f.read().strip()
+    except OSError:
+        synced = None
+    if digest == synced and not FORCE_SYNC:
+        return False
 
-@bot.event
-async def setup_hook():
     await bot.tree.sync()
-    logger.info("음악 봇 슬래시 명령어 동기화 완료!")
+    os.makedirs(os.path.dirname(COMMAND_HASH_FILE) or '.', exist_ok=True)
+    # 동기화가 성공한 뒤에만 기록해야 실패 시 다음 시작에서 다시 시도함
+    with open(COMMAND_HASH_FILE, 'w', encoding='utf-8') as f:
+        f.write(digest)
+    return True
+
+
+def create_bot(shard_count=None, shard_ids=None, sharded=False):
+    # 봇 설정
+    intents = discord.Intents.default()
+    intents.message_content = True
+    if sharded:
+        bot = commands.AutoShardedBot(command_prefix='!', intents=intents, shard_count=shard_count, shard_ids=shard_ids,
+                                      max_ratelimit_timeout=MAX_RATELIMIT_TIMEOUT)
+    else:
+        bot = commands.Bot(command_prefix='!', intents=intents, max_ratelimit_timeout=MAX_RATELIMIT_TIMEOUT)
+    bot.startup = StartupTimer() # 음악 cog의 /상태 명령어에서도 표시
+
+    @bot.event
+    async def setup_hook():
+        bot.startup.mark('login')
+        # 슬래시 명령어는 전역이므로 여러 프로세스 중 0번 샤드를 맡은 프로세스만 동기화
+        if shard_ids and 0 not in shard_ids:
+            return
+        try:
+            if await sync_commands_if_changed(bot):
+                logger.info("음악 봇 슬래시 명령어 동기화 완료!")
+            else:
+                logger.info("슬래시 명령어 구조가 바뀌지 않아 동기화를 건너뜁니다.")
+        except discord.HTTPException as e:
+            # 동기화 실패로 봇 전체가 뜨지 않는 일은 없도록 기존 명령어로 계속 동작
+            logger.error(f"슬래시 명령어 동기화 실패: {e}")
+        bot.startup.mark('command_sync')
 
-@bot.event
-async def on_ready():
-    logger.info(f'🎵 Music Bot Logged in as: {bot.user.name} ({bot.user.id})')
+    @bot.event
+    async def on_ready():
+        shards = f", shards {shard_label(sorted(bot.shards))}/{bot.shard_count}" if sharded else ""
+        logger.info(f'🎵 Music Bot Logged in as: {bot.user.name} ({bot.user.id}){shards}, {len(bot.guilds)} guilds')
+        # on_ready는 재연결 때마다 호출되므로 시작 시간은 처음 한 번만 기록
+        if not bot.startup.done:
+            bot.startup.done = True
+            bot.startup.mark('gateway_ready')
+            logger.info(f"Startup timings: {bot.startup.summary()}")
 
-async def main():
+    if sharded:
+        @bot.event
+        async def on_shard_ready(shard_id):
+            logger.info(f"Shard {shard_id} ready")
+
+        @bot.event
+        async def on_shard_disconnect(shard_id):
+            logger.warning(f"Shard {shard_id} disconnected")
+
+    return bot
+
+
+async def run_bot(shard_count=None, shard_ids=None, sharded=False):
+    bot = create_bot(shard_count, shard_ids, sharded)
+    bot.startup.mark('imports')
     async with bot:
         # music cog 로드
         await bot.load_extension('cogs.music')
+        bot.startup.mark('load_extension')
         await bot.start(TOKEN)
 
-if __name__ == '__main__':
+
+def run_shard_process(shard_count, shard_ids, index):
+    """샤드 프로세스 진입점. 각 프로세스는 자기 샤드에 속한 서버의 플레이어 상태만 가집니다."""
+    setup_logging(shard_label(shard_ids))
+    # 지표 엔드포인트는 프로세스마다 포트를 하나씩 밀어서 사용 (cogs 임포트 전에 설정)
+    metrics_port = int(os.getenv('MUSIC_METRICS_PORT', '0'))
+    if metrics_port:
+        os.environ['MUSIC_METRICS_PORT'] = str(metrics_port + index)
     try:
-        asyncio.run(main())
+        asyncio.run(run_bot(shard_count, shard_ids, sharded=True))
     except KeyboardInterrupt:
         pass
+
+
+def split_shards(shard_count, processes):
+    """전체 샤드를 프로세스 수만큼 연속된 구간으로 나눕니다."""
+    size = -(-shard_count // processes)
+    return [list(range(start, min(start + size, shard_count))) for start in range(0, shard_count, size)]
+
+
+def launch_processes(shard_count, processes):
+    setup_logging()
+    ctx = multiprocessing.get_context('spawn')
+    procs = {}
+
+    def spawn(index, shard_ids):
+        proc = ctx.Process(target=run_shard_process, args=(shard_count, shard_ids, index), name=f"shard-{shard_label(shard_ids)}")
+        proc.start()
+        procs[proc.sentinel] = (proc, index, shard_ids)
+        logger.info(f"Started {proc.name} (pid {proc.pid})")
+
+    for index, shard_ids in enumerate(split_shards(shard_count, processes)):
+        spawn(index, shard_ids)
+
+    try:
+        while procs:
+            for sentinel in wait(list(procs)):
+                proc, index, shard_ids = procs.pop(sentinel)
+                # 한 프로세스가 죽어도 다른 샤드는 계속 동작하도록 해당 프로세스만 다시 띄움
+                logger.error(f"{proc.name} exited with code {proc.exitcode}, restarting in {SHARD_RESTART_DELAY}s")
+                time.sleep(SHARD_RESTART_DELAY)
+                spawn(index, shard_ids)
+    except KeyboardInterrupt:
+        for proc, _, _ in procs.values():
+            proc.terminate()
+        for proc, _, _ in procs.values():
+            proc.join()
+
+
+def main():
+    if SHARD_PROCESSES > 1:
+        # 프로세스끼리 샤드를 나누려면 전체 샤드 수가 고정되어 있어야 함
+        shard_count = int(SHARD_COUNT) if SHARD_COUNT.isdigit() else SHARD_PROCESSES
+        launch_processes(shard_count, min(SHARD_PROCESSES, shard_count))
+        return
+
+    shard_count = int(SHARD_COUNT) if SHARD_COUNT.isdigit() else None
+    shard_ids = parse_shard_ids(SHARD_IDS) or None
+    sharded = bool(SHARD_COUNT or shard_ids)
+    if shard_ids and shard_count is None:
+        sys.exit("MUSIC_SHARD_IDS를 쓰려면 MUSIC_SHARD_COUNT에 전체 샤드 수를 지정해야 합니다.")
+
+    setup_logging(shard_label(shard_ids))
+    try:
+        asyncio.run(run_bot(shard_count, shard_ids, sharded))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import time
+import asyncio
+
+from cogs import extractor
+from cogs.extractor import ExtractorPool, _pick_caption
+
+
+def _fake_extract(profile, url):
+    # 워커 프로세스에서 실행됨: 'slow'는 시간 초과가 나도록 워커를 붙잡음
+    if url == 'slow':
+        time.sleep(30)
+    return url
+
+
+def test_timeout_restarts_pool_and_retries_queued_requests(monkeypatch):
+    monkeypatch.setattr(extractor, '_extract', _fake_extract)
+    pool = ExtractorPool({}, size=1)
+
+    async def run():
+        return await asyncio.gather(
+            pool.extract('search', 'slow', timeout=1, reject=False),
+            pool.extract('search', 'a', timeout=20, reject=False),
+            pool.extract('search', 'b', timeout=20, reject=False),
+            return_exceptions=True)
+
+    try:
+        timed_out, first, second = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert isinstance(timed_out, asyncio.TimeoutError)
+    # 대기 중이던 요청은 취소되지 않고 새 풀에서 다시 실행됨
+    assert (first, second) == ('a', 'b')
+    assert pool.stats()['restarts'] == 1
+
+
+def test_pick_caption_prefers_manual_subtitles():
+    info = {
+        'subtitles': {'en': [{'ext': 'json3', 'url': 'manual.json3'}, {'ext': 'vtt', 'url': 'manual.vtt'}]},
+        'automatic_captions': {'ko': [{'ext': 'vtt', 'url': 'auto-ko.vtt'}], 'en': [{'ext': 'vtt', 'url': 'auto.vtt'}]},
+    }
+    # 언어 우선순위가 먼저, 같은 언어 안에서는 직접 등록된 자막이 먼저
+    assert _pick_caption(info, ('ko', 'en')) == ('auto-ko.vtt', True)
+    assert _pick_caption(info, ('en',)) == ('manual.vtt', False)
+    assert _pick_caption(info, ('ja',)) == (None, False)
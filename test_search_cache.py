@@ -0,0 +1,65 @@
+from cogs.player import Track
+from cogs.search_cache import SearchCache
+
+
+def results(*ids):
+    return [Track(id=i, title=f"title {i}") for i in ids]
+
+
+def age(cache, query, seconds):
+    """저장 시각을 seconds만큼 과거로 돌립니다."""
+    key = cache.normalize(query)
+    saved_at, tracks, size = cache.entries[key]
+    cache.entries[key] = (saved_at - seconds, tracks, size)
+
+
+def test_normalized_hit_and_miss():
+    cache = SearchCache(ttl=60, refresh=True, stale_ttl=600)
+    assert cache.get("despacito") is None
+    cache.put("  Despacito   Luis ", results("a", "b"))
+    tracks, stale = cache.get("despacito luis")
+    assert [t.id for t in tracks] == ["a", "b"]
+    assert stale is False
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_results_are_copies():
+    cache = SearchCache()
+    cache.put("q", results("a"))
+    tracks, _ = cache.get("q")
+    tracks[0].url = "https://stream"
+    assert cache.get("q")[0][0].url is None
+
+
+def test_stale_then_expired_with_refresh():
+    cache = SearchCache(ttl=60, refresh=True, stale_ttl=600)
+    cache.put("q", results("a"))
+    age(cache, "q", 120)
+    tracks, stale = cache.get("q")
+    assert stale is True and tracks[0].id == "a"
+    age(cache, "q", 1000)
+    assert cache.get("q") is None
+    assert "q" not in cache.entries
+
+
+def test_without_refresh_ttl_is_hard_limit():
+    cache = SearchCache(ttl=60, refresh=False, stale_ttl=600)
+    cache.put("q", results("a"))
+    age(cache, "q", 120)
+    assert cache.get("q") is None
+
+
+def test_lru_eviction_by_count():
+    cache = SearchCache(max_entries=2)
+    cache.put("a", results("1"))
+    cache.put("b", results("2"))
+    cache.get("a") # a를 최근 사용으로
+    cache.put("c", results("3"))
+    assert set(cache.entries) == {"a", "c"}
+    assert cache.nbytes == sum(entry[2] for entry in cache.entries.values())
+
+
+def test_eviction_by_bytes():
+    cache = SearchCache(max_bytes=1)
+    cache.put("a", results("1"))
+    assert not cache.entries and cache.nbytes == 0
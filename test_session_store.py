@@ -0,0 +1,88 @@
+import pytest
+
+from cogs.player import GuildPlayer, Track
+from cogs.session_store import SessionStore
+
+GUILD = 1234
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(str(tmp_path / 'sessions.sqlite3'))
+    yield store
+    store.close()
+
+
+def ids(tracks):
+    return [track.id for track in tracks]
+
+
+def test_queue_operations_are_journaled_in_order(store):
+    player = GuildPlayer(GUILD, store=store)
+    player.extend(Track(id=str(i), title=str(i)) for i in range(5))
+    player.push(Track(id='5', title='5'))
+    player.push_front(Track(id='front', title='front'))
+    assert player.pop_next().id == 'front'
+    player.remove(2) # '2'
+    player.remove(-1) # '5'
+    queue, history = store.load(GUILD)
+    assert ids(queue) == ids(player.queue) == ['0', '1', '3', '4']
+    assert history == []
+
+
+def test_remove_at_both_ends(store):
+    for i in range(4):
+        store.push(GUILD, Track(id=str(i), title=str(i)))
+    store.remove_at(GUILD, 0)
+    store.remove_at(GUILD, -1)
+    assert ids(store.load(GUILD)[0]) == ['1', '2']
+
+
+def test_history_is_trimmed(store):
+    for i in range(10):
+        store.push_history(GUILD, Track(id=str(i), title=str(i)), 3)
+    assert ids(store.load(GUILD)[1]) == ['7', '8', '9']
+
+
+def test_restore_current_and_load_into_new_player(store):
+    player = GuildPlayer(GUILD, store=store)
+    player.extend([Track(id='a', title='a'), Track(id='b', title='b')])
+    current = player.pop_next()
+    player.start(current)
+    store.save_current(GUILD, current, 0, 10, 20)
+    store.save_position(GUILD, 42.5)
+    (guild_id, voice_id, text_id, track, position), = store.active_sessions()
+    assert (guild_id, voice_id, text_id, track.id, position) == (GUILD, 10, 20, 'a', 42.5)
+
+    # 재시작 후 새 플레이어에 그대로 불러옴
+    restored = GuildPlayer(GUILD, store=store)
+    restored.load(*store.load(GUILD))
+    assert ids(restored.queue) == ['b']
+
+    store.end_current(GUILD)
+    assert store.active_sessions() == []
+
+
+def test_replace_and_clear_keep_settings(store):
+    player = GuildPlayer(GUILD, store=store)
+    player.extend(Track(id=str(i), title=str(i)) for i in range(5))
+    player.shuffle()
+    assert ids(store.load(GUILD)[0]) == ids(player.queue)
+    store.save_settings(GUILD, True)
+    player.clear()
+    assert store.load(GUILD) == ([], [])
+    assert store.load_settings(GUILD) == {'timeline': True}
+    store.forget(GUILD)
+    assert store.load_settings(GUILD) == {'timeline': False}
+
+
+@pytest.mark.parametrize('src, dst', [(0, 4), (4, 0), (1, 3), (3, 1), (2, 2), (-1, 1)])
+def test_move_updates_queue_and_journal(store, src, dst):
+    player = GuildPlayer(GUILD, store=store)
+    player.extend(Track(id=str(i), title=str(i)) for i in range(5))
+    player.push_front(Track(id='front', title='front')) # 음수 순번이 섞여도 순서 유지
+    expected = ids(player.queue)
+    expected.insert(dst % len(expected), expected.pop(src))
+    player.move(src, dst)
+    assert ids(player.queue) == expected
+    assert ids(store.load(GUILD)[0]) == expected
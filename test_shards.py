@@ -0,0 +1,32 @@
+import pytest
+
+# main.py는 discord.py를 임포트하므로 설치되지 않은 환경에서는 건너뜀
+pytest.importorskip('discord')
+pytest.importorskip('dotenv')
+
+from main import parse_shard_ids, shard_label, split_shards
+
+
+def test_parse_shard_ids():
+    assert parse_shard_ids("") == []
+    assert parse_shard_ids("0-3") == [0, 1, 2, 3]
+    assert parse_shard_ids("6, 0-1 ,1") == [0, 1, 6]
+
+
+def test_shard_label():
+    assert shard_label([]) is None
+    assert shard_label([2]) == "2"
+    assert shard_label([0, 1, 2]) == "0-2"
+    assert shard_label([0, 2, 4]) == "0,2,4"
+
+
+@pytest.mark.parametrize('shard_count, processes', [(1, 1), (4, 2), (5, 2), (10, 3), (3, 5)])
+def test_split_shards_covers_every_shard_once(shard_count, processes):
+    groups = split_shards(shard_count, processes)
+    assert len(groups) <= processes
+    assert [shard for group in groups for shard in group] == list(range(shard_count))
+    assert all(group == list(range(group[0], group[-1] + 1)) for group in groups)
+
+
+def test_split_shards_sizes():
+    assert split_shards(10, 3) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
@@ -0,0 +1,90 @@
+import asyncio
+
+from cogs.subtitle_parser import parse_captions, parse_caption_stream
+
+VTT = """WEBVTT
+Kind: captions
+Language: ko
+
+NOTE 주석 블록은 무시
+
+00:01.000 --> 00:03.500 align:start position:0%
+<c>안녕</c>&nbsp;하세요
+둘째 줄
+
+01:00:02.250 --> 01:00:04.000
+한 시간 뒤
+"""
+
+SRT = """1
+00:00:01,000 --> 00:00:02,500
+<i>first</i>
+
+2
+00:00:03,000 --> 00:00:04,000
+second
+line
+"""
+
+# 유튜브 자동 자막: 앞 큐의 마지막 줄 반복 + 10ms 짜리 완성 큐
+ROLLING = """WEBVTT
+
+00:00:00.000 --> 00:00:02.000 align:start position:0%
+ 
+never<00:00:00.400><c> gonna</c>
+
+00:00:02.000 --> 00:00:02.010 align:start position:0%
+never gonna
+ 
+
+00:00:02.010 --> 00:00:04.010 align:start position:0%
+never gonna
+give you up
+"""
+
+
+def test_vtt_cues_and_hour_timestamps():
+    assert parse_captions(VTT.splitlines(True), merge=False) == [
+        (1.0, 3.5, "안녕 하세요\n둘째 줄"),
+        (3602.25, 3604.0, "한 시간 뒤"),
+    ]
+
+
+def test_srt_cues():
+    assert parse_captions(SRT.splitlines(True)) == [
+        (1.0, 2.5, "first"),
+        (3.0, 4.0, "second\nline"),
+    ]
+
+
+def test_crlf_and_bom():
+    text = '﻿' + SRT.replace('\n', '\r\n')
+    assert [cue[2] for cue in parse_captions(text.splitlines(True))] == ["first", "second\nline"]
+
+
+def test_rolling_captions_are_merged():
+    assert parse_captions(ROLLING.splitlines(True)) == [
+        (0.0, 2.01, "never gonna"),
+        (2.01, 4.01, "give you up"),
+    ]
+    # 합치지 않으면 반복된 줄이 그대로 남음
+    assert len(parse_captions(ROLLING.splitlines(True), merge=False)) == 3
+
+
+def test_bench_fixture():
+    with open('bench/fixtures/captions.en.vtt', encoding='utf-8') as f:
+        cues = parse_captions(f)
+    assert cues[:2] == [
+        (0.0, 2.01, "never gonna give you"),
+        (2.01, 4.02, "up never gonna let"),
+    ]
+
+
+def test_stream_parsing_matches_lines():
+    async def stream():
+        for line in VTT.encode('utf-8').splitlines(True):
+            yield line
+
+    track = asyncio.run(parse_caption_stream(stream()))
+    assert list(track.starts) == [1.0, 3602.25]
+    assert track.texts[1] == "한 시간 뒤"
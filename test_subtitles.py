@@ -0,0 +1,51 @@
+from cogs.subtitles import SubtitleTrack, cues_from_snippets, clean_text
+
+CUES = [(5.0, 7.5, "둘째 줄"), (0.5, 2.0, "첫 줄"), (10.0, 12.0, "셋째 줄")]
+
+
+def test_from_cues_sorts_by_start():
+    track = SubtitleTrack.from_cues(CUES)
+    assert list(track.starts) == [0.5, 5.0, 10.0]
+    assert track.texts == ["첫 줄", "둘째 줄", "셋째 줄"]
+
+
+def test_index_at_uses_lead():
+    track = SubtitleTrack.from_cues(CUES)
+    assert track.index_at(0.0, lead=0) == -1
+    assert track.index_at(0.0) == 0 # 기본 1초 앞당김
+    assert track.index_at(5.0, lead=0) == 1
+    assert track.index_at(9.99, lead=0) == 1
+    assert track.index_at(100.0, lead=0) == 2
+    # 마지막으로 시작된 자막은 종료 시간이 지나도 계속 표시
+    assert track.text_at(8.0, lead=0) == "둘째 줄"
+    assert track.text_at(0.0, lead=0) == ""
+
+
+def test_bytes_round_trip():
+    track = SubtitleTrack.from_cues(CUES)
+    restored = SubtitleTrack.from_bytes(track.to_bytes())
+    assert list(restored.starts) == list(track.starts)
+    assert list(restored.ends) == list(track.ends)
+    assert restored.texts == track.texts
+
+
+def test_bytes_round_trip_empty():
+    restored = SubtitleTrack.from_bytes(SubtitleTrack().to_bytes())
+    assert len(restored) == 0
+    assert restored.texts == []
+
+
+def test_bytes_are_little_endian():
+    import struct, zlib
+    data = zlib.decompress(SubtitleTrack.from_cues([(1.5, 2.5, "a")]).to_bytes())
+    assert struct.unpack_from('<Idd', data) == (1, 1.5, 2.5)
+
+
+def test_cues_from_snippets_cleans_and_drops_empty():
+    class Snippet:
+        def __init__(self, start, duration, text):
+            self.start, self.duration, self.text = start, duration, text
+
+    cues = cues_from_snippets([Snippet(1.0, 2.0, "<i>hi</i>&nbsp;there"), Snippet(3.0, 1.0, "  ")])
+    assert cues == [(1.0, 3.0, "hi there")]
+    assert clean_text("<b>x</b>") == "x"
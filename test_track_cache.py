@@ -0,0 +1,78 @@
+import sqlite3
+import time
+
+import pytest
+
+from cogs.player import Track
+from cogs.track_cache import TrackCache, STREAM_EXPIRE_MARGIN, extract_video_id, is_stream_fresh, stream_expire
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = TrackCache(str(tmp_path / 'tracks.sqlite3'))
+    yield cache
+    cache.close()
+
+
+def stream_url(expire):
+    return f"https://rr1---sn.googlevideo.com/videoplayback?expire={int(expire)}&ei=abc&itag=251"
+
+
+def test_stream_expire():
+    assert stream_expire(None) is None
+    assert stream_expire("https://example.com/audio.webm") is None
+    assert stream_expire(stream_url(1700000000)) == 1700000000
+    # 경로형 서명 주소 (manifest 등)
+    assert stream_expire("https://manifest.googlevideo.com/api/manifest/hls/expire/1700000000/ei/x") == 1700000000
+
+
+def test_extract_video_id():
+    assert extract_video_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42") == "dQw4w9WgXcQ"
+    assert extract_video_id("https://youtu.be/dQw4w9WgXcQ?si=x") == "dQw4w9WgXcQ"
+    assert extract_video_id("https://www.youtube.com/shorts/dQw4w9WgXcQ") == "dQw4w9WgXcQ"
+    assert extract_video_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123") is None
+    assert extract_video_id("https://example.com/video") is None
+
+
+def test_is_stream_fresh():
+    now = time.time()
+    assert not is_stream_fresh(Track())
+    assert is_stream_fresh(Track(url="https://example.com/audio.webm")) # 만료 정보 없음
+    assert is_stream_fresh(Track(url=stream_url(now + 3600)))
+    assert not is_stream_fresh(Track(url=stream_url(now + STREAM_EXPIRE_MARGIN - 10)))
+
+
+def test_round_trip_keeps_stream_fields(cache):
+    song = Track(id='a', url=stream_url(time.time() + 3600), title='t', duration=10, webpage_url='https://youtu.be/a',
+                 acodec='opus', caption_url='https://www.youtube.com/api/timedtext?v=a', caption_auto=True)
+    cache.put(song)
+    cached = cache.get('a')
+    assert cached.to_dict() == song.to_dict()
+    assert cache.stats()['hits'] == 1
+
+
+def test_expired_stream_drops_stream_fields(cache):
+    cache.put(Track(id='a', url=stream_url(time.time() + 10), title='t', acodec='opus', caption_url='c', caption_auto=True))
+    cached = cache.get('a')
+    assert cached.title == 't'
+    assert (cached.url, cached.acodec, cached.caption_url, cached.caption_auto) == (None, None, None, None)
+    assert cache.stats()['stale_hits'] == 1
+    assert cache.get('missing') is None and cache.stats()['misses'] == 1
+
+
+def test_old_schema_is_migrated(tmp_path):
+    path = str(tmp_path / 'tracks.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tracks (id TEXT PRIMARY KEY, title TEXT NOT NULL, thumbnail TEXT, duration REAL, "
+        "webpage_url TEXT, url TEXT, expire INTEGER, updated_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO tracks (id, title, url, updated_at) VALUES ('a', 't', 'https://x', ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+    cache = TrackCache(path)
+    try:
+        cached = cache.get('a')
+        assert (cached.url, cached.acodec, cached.caption_url) == ('https://x', None, None)
+    finally:
+        cache.close()
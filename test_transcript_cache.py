@@ -0,0 +1,66 @@
+import pytest
+
+from cogs.subtitles import SubtitleTrack
+from cogs.transcript_cache import TranscriptCache, ACCESS_FLUSH_SIZE
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        cache = TranscriptCache(path=str(tmp_path / 'transcripts.sqlite3'), **kwargs)
+        caches.append(cache)
+        return cache
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def track(text):
+    return SubtitleTrack.from_cues([(0.0, 1.0, text)])
+
+
+def test_round_trip_and_negative_entry(make_cache):
+    cache = make_cache()
+    assert cache.get('a') is None
+    cache.put('a', track("hello"))
+    cache.put('b', SubtitleTrack())
+    assert cache.get('a').texts == ["hello"]
+    negative = cache.get('b')
+    assert negative is not None and len(negative) == 0
+    stats = cache.stats()
+    assert (stats['hits'], stats['negative_hits'], stats['misses']) == (1, 1, 1)
+
+
+def test_expired_negative_rows_are_purged(make_cache):
+    cache = make_cache(negative_ttl=0)
+    cache.put('gone', SubtitleTrack())
+    assert cache.get('gone') is None # 만료된 "자막 없음"은 다시 확인
+    cache.purged_at = 0.0
+    cache.put('kept', track("x"))
+    ids = {row[0] for row in cache.conn.execute("SELECT id FROM transcripts")}
+    assert ids == {'kept'}
+
+
+def test_access_times_are_batched(make_cache):
+    cache = make_cache()
+    for i in range(ACCESS_FLUSH_SIZE):
+        cache.put(str(i), track("y"))
+    cache.put('a', track("x"))
+    before = cache.conn.execute("SELECT accessed_at FROM transcripts WHERE id = 'a'").fetchone()[0]
+    cache.get('a')
+    assert 'a' in cache.accessed
+    assert cache.conn.execute("SELECT accessed_at FROM transcripts WHERE id = 'a'").fetchone()[0] == before
+    for i in range(ACCESS_FLUSH_SIZE - 1):
+        cache.get(str(i))
+    assert not cache.accessed # 서로 다른 항목이 쌓이면 한 번에 기록
+    assert cache.conn.execute("SELECT accessed_at FROM transcripts WHERE id = 'a'").fetchone()[0] > before
+
+
+def test_eviction_keeps_size_under_limit(make_cache):
+    cache = make_cache(max_bytes=200)
+    for i in range(20):
+        cache.put(str(i), track(f"cue {i} " * 20))
+    assert cache.stats()['bytes'] <= 200
+    assert cache.get('19') is not None # 가장 최근 항목은 남음